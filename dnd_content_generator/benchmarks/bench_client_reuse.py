@@ -0,0 +1,150 @@
+"""
+Per-request latency of a fresh AsyncOpenAI client per call versus the pooled
+client owned by GPTService, measured against a local stub chat-completions server.
+
+The stub sleeps for --connect-delay on every new TCP connection to stand in for
+the TCP + TLS handshake a real provider costs; reused keep-alive connections skip it.
+
+Run from the dnd_content_generator directory:
+    python -m benchmarks.bench_client_reuse --requests 100 --concurrency 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+
+from src.services.gpt_service import GPTService
+from src.services.logger import logger
+
+COMPLETION = {
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": "{\"name\": \"Stub\", \"description\": \"Stub item.\"}"},
+        "finish_reason": "stop"
+    }],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2}
+}
+
+
+def make_handler(connect_delay, response_delay):
+    body = json.dumps(COMPLETION).encode("utf-8")
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # Called once per connection, not per request
+            time.sleep(connect_delay)
+            super().setup()
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            time.sleep(response_delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(connect_delay, response_delay):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(connect_delay, response_delay))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def bench_config(base_url):
+    return {
+        "gpt-api": {"api-key": "bench", "base-url": base_url},
+        "app-settings": {"models": ["stub"], "max-tokens": 16}
+    }
+
+
+async def run_fresh(base_url, n_requests, concurrency):
+    """The old behaviour: a new client (and connection pool) for every request."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            client = openai.AsyncOpenAI(api_key="bench", base_url=base_url)
+            await client.chat.completions.create(
+                model="stub",
+                messages=[{"role": "user", "content": "bench"}],
+                max_tokens=16
+            )
+            latencies.append(time.perf_counter() - start)
+            await client.close()
+
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return latencies
+
+
+async def run_pooled(base_url, n_requests, concurrency):
+    service = GPTService(bench_config(base_url))
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await service.send_prompt_async("bench")
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(one() for _ in range(n_requests)))
+    finally:
+        await service.aclose()
+    return latencies
+
+
+def report(label, latencies, wall):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<8} mean={statistics.mean(latencies) * 1000:7.2f}ms "
+          f"p50={statistics.median(latencies) * 1000:7.2f}ms "
+          f"p95={p95 * 1000:7.2f}ms wall={wall:6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--connect-delay", type=float, default=0.05,
+                        help="Seconds the stub spends on each new connection (simulated handshake).")
+    parser.add_argument("--response-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    server = start_stub_server(args.connect_delay, args.response_delay)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    try:
+        for label, runner in (("fresh", run_fresh), ("pooled", run_pooled)):
+            start = time.perf_counter()
+            latencies = asyncio.run(runner(base_url, args.requests, args.concurrency))
+            report(label, latencies, time.perf_counter() - start)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
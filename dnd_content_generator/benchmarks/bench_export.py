@@ -0,0 +1,70 @@
+"""
+Detailed export of N items: the previous behaviour (one pretty-printed JSON file per item)
+versus a single streaming export from the ResultStore.
+
+Run from the dnd_content_generator directory:
+    python -m benchmarks.bench_export --items 10000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from src.services.result_store import ResultStore
+
+
+def make_item(i):
+    return {
+        "Name": f"Rusted Cleaver {i}",
+        "Description": "A pitted blade that has seen better centuries.",
+        "Weapon Category": "Martial",
+        "Damage Medium": "1d8",
+        "Cost Gp": str(15 + i)
+    }
+
+
+def export_per_file(directory, items):
+    for i, item in enumerate(items):
+        # Sequence suffix stands in for the timestamp; the old second-resolution names collided
+        with open(os.path.join(directory, f"weapons_{i}.json"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(item, ensure_ascii=False, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+
+    items = [make_item(i) for i in range(args.items)]
+    with tempfile.TemporaryDirectory() as tmp:
+        per_file_dir = os.path.join(tmp, "per_file")
+        os.makedirs(per_file_dir)
+        start = time.perf_counter()
+        export_per_file(per_file_dir, items)
+        per_file = time.perf_counter() - start
+
+        store = ResultStore(os.path.join(tmp, "store"))
+        start = time.perf_counter()
+        for item in items:
+            store.append(item, "Melee Weapon", "Dark", 1, 3, run_id="bench")
+        store.flush()
+        append = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.export_jsonl(os.path.join(tmp, "export.jsonl"), run_id="bench")
+        jsonl = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.export_csv(os.path.join(tmp, "export.csv"), run_id="bench")
+        csv_export = time.perf_counter() - start
+        store.close()
+
+    print(f"per-file export   {per_file * 1000:9.1f}ms ({args.items} files)")
+    print(f"store append      {append * 1000:9.1f}ms (batched fsync)")
+    print(f"store JSONL       {jsonl * 1000:9.1f}ms (1 file)")
+    print(f"store CSV         {csv_export * 1000:9.1f}ms (1 file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time to fill and show the results table with N rows of M fields: the previous QTableWidget
+(one QTableWidgetItem per cell, ResizeToContents on every column) versus ResultsView's
+model/view table, both loaded at once and appended row by row.
+
+Run from the dnd_content_generator directory (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_results_view --rows 5000 --fields 20
+"""
+import argparse
+import time
+
+from PySide6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem, QHeaderView
+
+from src.ui.results_view import ResultsView
+
+
+def make_results(rows, fields):
+    results = []
+    for i in range(rows):
+        item = {"Name": f"Rusted Cleaver {i}", "Description": "A pitted blade that has seen better centuries. " * 3}
+        for f in range(fields - 2):
+            item[f"Field {f}"] = f"value {i * f % 997}"
+        results.append(item)
+    return results
+
+
+def fill_table_widget(table, results):
+    headers = list(results[0].keys())
+    table.clear()
+    table.setColumnCount(len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    for i in range(len(headers)):
+        table.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeToContents)
+    table.setRowCount(len(results))
+    for r, result in enumerate(results):
+        for c, key in enumerate(headers):
+            table.setItem(r, c, QTableWidgetItem(str(result.get(key, ""))))
+
+
+def timed(app, widget, fill):
+    start = time.perf_counter()
+    fill()
+    # Layout and painting is where per-cell measuring happens
+    widget.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    widget.hide()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--fields", type=int, default=20)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    results = make_results(args.rows, args.fields)
+
+    table = QTableWidget()
+    table.resize(1600, 800)
+    widget_time = timed(app, table, lambda: fill_table_widget(table, results))
+
+    view = ResultsView()
+    view.resize(1600, 800)
+    view_time = timed(app, view, lambda: view.display_results(results))
+
+    appended = ResultsView()
+    appended.resize(1600, 800)
+
+    def append_all():
+        for result in results:
+            appended.append_result(result)
+
+    append_time = timed(app, appended, append_all)
+
+    print(f"QTableWidget + ResizeToContents {widget_time * 1000:9.1f}ms ({args.rows} rows x {args.fields} fields)")
+    print(f"ResultsView display_results     {view_time * 1000:9.1f}ms")
+    print(f"ResultsView append_result x{args.rows:<5} {append_time * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Latency of ResultStore.search over a store of N items: full-text prefix queries of varying
+selectivity, combined with type/context/level filters, one 50-item page each.
+
+Run from the dnd_content_generator directory:
+    python -m benchmarks.bench_search --items 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.services.result_store import ResultStore
+
+ADJECTIVES = ["Rusted", "Gleaming", "Cursed", "Ancient", "Hollow", "Verdant", "Frozen", "Ashen", "Gilded", "Silent"]
+NOUNS = ["Cleaver", "Longsword", "Amulet", "Tonic", "Lantern", "Shield", "Tome", "Crown", "Dagger", "Bow"]
+WORDS = ["blade", "ember", "whisper", "tide", "shadow", "bone", "storm", "thorn", "glass", "moss", "iron", "silk"]
+TYPES = ["Melee Weapon", "Ranged Weapon", "Potion", "Wondrous Item", "Armor"]
+CONTEXTS = ["Dark", "Haunted", "Aquatic", "Elven", "Infernal", "Celestial"]
+
+QUERIES = [
+    ("common word", {"text": "blade"}),
+    ("rare prefix", {"text": "gild crow"}),
+    ("name + type", {"text": "cursed", "content_type": "Potion"}),
+    ("context + level", {"context": "Haunted", "level": 7}),
+    ("everything", {"text": "storm", "content_type": "Armor", "context": "Elven", "level": 3}),
+    ("no filters", {}),
+    ("deep page", {"text": "iron", "offset": 2000}),
+]
+
+
+def make_item(rng, i):
+    name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+    description = " ".join(rng.choice(WORDS) for _ in range(20))
+    return {"Name": name, "Description": description, "Weight": str(rng.randint(1, 30))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultStore(os.path.join(tmp, "store"), sync_every=5000)
+        start = time.perf_counter()
+        for i in range(args.items):
+            min_level = rng.randint(1, 15)
+            store.append(
+                make_item(rng, i), rng.choice(TYPES), ", ".join(rng.sample(CONTEXTS, 2)),
+                min_level, min_level + rng.randint(0, 5), run_id=f"run{i // 1000}"
+            )
+        store.flush()
+        print(f"filled {args.items} items in {time.perf_counter() - start:.1f}s\n")
+
+        for label, query in QUERIES:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                items, has_more = store.search(limit=50, **query)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{label:<16} median {statistics.median(timings):7.2f}ms  max {max(timings):7.2f}ms  "
+                  f"({len(items)} items, more={has_more})")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-keystroke cost of filtering the category tree: the previous recursive walk (lowercasing
+and substring-testing every node's text) versus Taxonomy's word index plus the hidden-set
+delta MainWindow applies. Typing a query is replayed one prefix at a time over the category
+file repeated --scale times, so no display is needed.
+
+Run from the dnd_content_generator directory:
+    python -m benchmarks.bench_tree_filter --scale 10 --query "outer rim"
+"""
+import argparse
+import json
+import time
+
+from src.models.taxonomy import Taxonomy
+
+
+def scaled(data, scale):
+    return {f"{key} {copy}" if copy else key: value for copy in range(scale) for key, value in data.items()}
+
+
+def walk_filter(data, text):
+    """The old _filter_item: one text() + lower() per node and a setHidden for every node."""
+    hidden = []
+
+    def visit(key, value):
+        match = text in key.lower()
+        child_match = False
+        if isinstance(value, dict):
+            for child_key, child_value in value.items():
+                child_match = visit(child_key, child_value) or child_match
+        elif isinstance(value, list):
+            for leaf in value:
+                child_match = visit(leaf, None) or child_match
+        hidden.append(not (match or child_match))
+        return match or child_match
+
+    for key, value in data.items():
+        visit(key, value)
+    return hidden
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default="src/resources/starwars_categories.json")
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--query", default="outer rim")
+    args = parser.parse_args()
+
+    with open(args.file, "r", encoding="utf-8") as f:
+        data = scaled(json.load(f), args.scale)
+    prefixes = [args.query[:i] for i in range(1, len(args.query) + 1)] + [""]
+
+    start = time.perf_counter()
+    taxonomy = Taxonomy(data)
+    # The word index is built on the first match
+    taxonomy.match(args.query)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for prefix in prefixes:
+        walk_filter(data, prefix.strip().lower())
+    walk_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    previous = set()
+    changed = 0
+    for prefix in prefixes:
+        matches = taxonomy.match(prefix)
+        hidden = taxonomy.hidden_for(None if matches is None else taxonomy.with_ancestors(matches))
+        changed += len(hidden ^ previous)
+        previous = hidden
+    index_time = time.perf_counter() - start
+
+    per_key = len(prefixes)
+    print(f"{len(taxonomy.nodes)} nodes, {per_key} keystrokes of {args.query!r}")
+    print(f"Taxonomy + index (once a file)  {build * 1000:8.2f}ms")
+    print(f"Recursive walk per keystroke    {walk_time * 1000 / per_key:8.2f}ms  ({len(taxonomy.nodes) * per_key} setHidden calls in total)")
+    print(f"Word index per keystroke        {index_time * 1000 / per_key:8.2f}ms  ({changed} setHidden calls in total)")
+
+
+if __name__ == "__main__":
+    main()
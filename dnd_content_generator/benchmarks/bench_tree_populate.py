@@ -0,0 +1,99 @@
+"""
+Time to load a category file into the tree and show it: the previous QTreeWidget population
+(an item per node, then a colouring pass and a check-state pass) versus TaxonomyModel, which
+resets the model and leaves children, colours and check states to be asked for on demand.
+Every list of leaves in the file is repeated --scale times; the Taxonomy parse is timed on
+its own.
+
+Run from the dnd_content_generator directory (no display needed):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_tree_populate --scale 10
+"""
+import argparse
+import json
+import time
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor
+from PySide6.QtWidgets import QApplication, QTreeView, QTreeWidget, QTreeWidgetItem
+
+from src.models.taxonomy import Taxonomy
+from src.ui.taxonomy_model import PALETTE, TaxonomyModel
+
+
+def scaled(value, scale):
+    """`value` with every list of leaves repeated `scale` times, keeping the same top-level groups."""
+    if isinstance(value, dict):
+        return {key: scaled(child, scale) for key, child in value.items()}
+    if isinstance(value, list):
+        return [f"{leaf} {copy}" if copy else leaf for copy in range(scale) for leaf in value]
+    return value
+
+
+def fill_tree_widget(tree, data):
+    tree.clear()
+    tree.blockSignals(True)
+
+    def add(parent, text, value, depth):
+        item = QTreeWidgetItem([str(text)])
+        parent.addChild(item)
+        item.setBackground(0, QBrush(QColor(PALETTE[depth % len(PALETTE)])))
+        item.setFlags(item.flags() | Qt.ItemIsUserCheckable | (Qt.ItemIsAutoTristate if value else Qt.NoItemFlags))
+        item.setCheckState(0, Qt.Unchecked)
+        if isinstance(value, dict):
+            for key, child in value.items():
+                add(item, key, child, depth + 1)
+        elif isinstance(value, list):
+            for leaf in value:
+                add(item, leaf, None, depth + 1)
+
+    root = tree.invisibleRootItem()
+    for key, value in data.items():
+        add(root, key, value, 0)
+    tree.blockSignals(False)
+
+
+def timed(app, widget, fill):
+    start = time.perf_counter()
+    fill()
+    widget.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    widget.hide()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--file", default="src/resources/starwars_categories.json")
+    parser.add_argument("--scale", type=int, default=10)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    with open(args.file, "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    for scale in sorted({1, args.scale}):
+        data = scaled(base, scale)
+        start = time.perf_counter()
+        taxonomy = Taxonomy(data)
+        parse_time = time.perf_counter() - start
+
+        widget = QTreeWidget()
+        widget.resize(400, 800)
+        widget_time = timed(app, widget, lambda: fill_tree_widget(widget, data))
+
+        model = TaxonomyModel("Categories & Types", "Select a Category...")
+        view = QTreeView()
+        view.setUniformRowHeights(True)
+        view.setModel(model)
+        view.resize(400, 800)
+        model_time = timed(app, view, lambda: model.set_taxonomy(taxonomy))
+
+        print(f"{len(taxonomy.nodes)} nodes")
+        print(f"  Taxonomy parse              {parse_time * 1000:8.1f}ms")
+        print(f"  QTreeWidget items + passes  {widget_time * 1000:8.1f}ms")
+        print(f"  TaxonomyModel reset         {model_time * 1000:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
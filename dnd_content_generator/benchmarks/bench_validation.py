@@ -0,0 +1,88 @@
+"""
+Per-item cost of SchemaService.validate_data with the compiled validator cache
+versus the previous behaviour (meta-schema check + new Draft7Validator per item).
+
+Run from the dnd_content_generator directory:
+    python -m benchmarks.bench_validation --items 100 --repeat 5
+"""
+import argparse
+import time
+
+from jsonschema import Draft7Validator
+
+from src.services.schema_service import SchemaService
+
+STATBLOCK_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "Melee Weapon",
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "ui_order": 1},
+        "description": {"type": "string", "ui_order": 2},
+        "weapon_category": {"type": "string", "enum": ["Simple", "Martial", "Exotic"], "ui_order": 3},
+        "damage_small": {"type": "string", "pattern": "^[0-9]+d[0-9]+$", "ui_order": 4},
+        "damage_medium": {"type": "string", "pattern": "^[0-9]+d[0-9]+$", "ui_order": 5},
+        "critical": {"type": "string", "ui_order": 6},
+        "range_increment": {"type": "integer", "minimum": 0, "ui_order": 7},
+        "weight": {"type": "number", "minimum": 0, "ui_order": 8},
+        "damage_type": {"type": "array", "items": {"type": "string"}, "ui_order": 9},
+        "cost_gp": {"type": "integer", "minimum": 0, "ui_order": 10},
+        "special_properties": {"type": "string", "ui_order": 11},
+        "drawbacks": {"type": "string", "ui_order": 12}
+    },
+    "required": ["name", "description", "weapon_category", "damage_medium", "cost_gp"],
+    "additionalProperties": False
+}
+
+
+def make_item(i):
+    return {
+        "name": f"Rusted Cleaver {i}",
+        "description": "A pitted blade that has seen better centuries.",
+        "weapon_category": "Martial",
+        "damage_small": "1d6",
+        "damage_medium": "1d8",
+        "critical": "19-20/x2",
+        "range_increment": 0,
+        "weight": 6.5,
+        "damage_type": ["slashing"],
+        "cost_gp": 15 + i,
+        "special_properties": "None",
+        "drawbacks": "Breaks on a natural 1."
+    }
+
+
+def validate_uncached(schema, data):
+    Draft7Validator.check_schema(schema)
+    Draft7Validator(schema).validate(data)
+
+
+def timed(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(STATBLOCK_SCHEMA, item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    items = [make_item(i) for i in range(args.items)]
+    service = SchemaService()
+
+    uncached = timed(validate_uncached, items, args.repeat)
+    cached = timed(service.validate_data, items, args.repeat)
+    for label, total in (("uncached", uncached), ("cached", cached)):
+        print(f"{label:<9} {total * 1000:8.2f}ms per {args.items} items, "
+              f"{total / args.items * 1e6:8.1f}us per item")
+    print(f"speedup   {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
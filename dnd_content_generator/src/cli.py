@@ -0,0 +1,188 @@
+"""
+Headless batch generation. Runs a job file through DataController without the GUI:
+
+    python -m src.cli jobs.json --output results.jsonl --concurrency 4
+
+The job file is JSON:
+
+    {
+      "system": "D&D 3.5e",
+      "setting": "Forgotten Realms",
+      "campaign_prompt": "",
+      "jobs": [
+        {"type": "Simple Melee Weapon", "category": "Melee Weapons",
+         "contexts": ["Dark", "Haunted"], "min_level": 1, "max_level": 5, "count": 200}
+      ]
+    }
+
+Every validated item is appended to the output as one JSON line tagged with its job id.
+The output file doubles as the checkpoint: re-running the same command after a crash
+counts the lines already written per job and only generates what is still missing.
+
+Nothing here may import Qt, directly or through the modules it uses.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from src.controllers.data_controller import DataController
+from src.models.job_queue import Job, JobQueue
+from src.models.state import AppState
+from src.services.gpt_service import GPTService
+from src.services.logger import logger
+
+
+class HeadlessController:
+    """Stands in for AppController: DataController only reads `state` from it."""
+
+    def __init__(self, system="", setting="", campaign_prompt=""):
+        self.state = AppState()
+        self.state.system = system
+        self.state.setting = setting
+        self.state.campaign_prompt = campaign_prompt
+
+
+def load_jobs(path):
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    jobs = []
+    # Checkpoint records are counted per job id, so two jobs sharing one would share progress
+    seen = {}
+    for index, entry in enumerate(spec.get("jobs", [])):
+        if not entry.get("type") or not entry.get("contexts"):
+            raise ValueError(f"Job {index + 1} in {path} needs a 'type' and at least one context.")
+        job = Job(
+            entry["type"],
+            entry["contexts"],
+            entry.get("count", 1),
+            entry.get("min_level", 1),
+            entry.get("max_level", 3),
+            entry.get("category", ""),
+            entry.get("id")
+        )
+        if job.id in seen:
+            raise ValueError(
+                f"Job {index + 1} in {path} has the same id as job {seen[job.id]} ({job.id}); "
+                f"merge their counts or give one of them its own 'id'."
+            )
+        seen[job.id] = index + 1
+        jobs.append(job)
+    return spec, JobQueue(jobs)
+
+
+def read_checkpoint(path):
+    """
+    Count the items already written per job. A torn last line left by a crash is cut off so
+    new records start on a clean line; an unreadable line elsewhere is skipped and left in place.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, start=1):
+            # Every record ends in a newline, so only the last line can be missing one
+            if not line.endswith(b"\n"):
+                break
+            valid_bytes += len(line)
+            try:
+                job_id = json.loads(line)["job"]
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Skipping unreadable line {number} of {path}.")
+                continue
+            done[job_id] = done.get(job_id, 0) + 1
+    if valid_bytes < os.path.getsize(path):
+        logger.warning(f"Truncating incomplete record at the end of {path}.")
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+class ResultWriter:
+    """Appends one JSON line per item; flushed per item, fsynced per finished chunk."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, job, item):
+        record = {
+            "job": job.id,
+            "category": job.category,
+            "type": job.content_type,
+            "contexts": job.contexts,
+            "min_level": job.min_level,
+            "max_level": job.max_level,
+            "created_at": time.time(),
+            "item": item
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def sync(self):
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+
+async def run_queue(data_controller, queue, writer, concurrency, chunk_size):
+    def on_progress(job):
+        writer.sync()
+        logger.info(f"[{job.id}] {job.content_type}: {job.completed}/{job.count}")
+
+    try:
+        return await data_controller.run_jobs_async(
+            queue,
+            on_result=writer.write,
+            on_progress=on_progress,
+            max_concurrent=concurrency,
+            chunk_size=chunk_size
+        )
+    finally:
+        await data_controller.gpt_service.aclose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate content from a job file without the GUI.")
+    parser.add_argument("job_file")
+    parser.add_argument("--output", help="JSONL file to append results to (default: <job file>.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="chunks generated at the same time")
+    parser.add_argument("--chunk-size", type=int, default=10, help="items per generate call; progress is synced per chunk")
+    args = parser.parse_args(argv)
+
+    spec, queue = load_jobs(args.job_file)
+    output = args.output or os.path.splitext(args.job_file)[0] + ".jsonl"
+    done = read_checkpoint(output)
+    for job in queue.jobs:
+        job.completed = done.get(job.id, 0)
+    if done:
+        logger.info(f"Resuming from {output}: {queue.completed} of {queue.total} item(s) already generated.")
+
+    controller = HeadlessController(spec.get("system", ""), spec.get("setting", ""), spec.get("campaign_prompt", ""))
+    data_controller = DataController(GPTService(), controller)
+    writer = ResultWriter(output)
+    try:
+        produced = asyncio.run(run_queue(
+            data_controller, queue, writer, max(1, args.concurrency), max(1, args.chunk_size)
+        ))
+    except KeyboardInterrupt:
+        logger.warning("Interrupted; re-run the same command to resume.")
+        return 130
+    finally:
+        writer.close()
+
+    unfinished = queue.unfinished_jobs()
+    for job in unfinished:
+        logger.warning(f"[{job.id}] {job.content_type}: only {job.completed}/{job.count} item(s) generated.")
+    logger.info(f"Wrote {len(produced)} new item(s) to {output}.")
+    return 1 if unfinished else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,164 @@
 import asyncio
-from PySide6.QtCore import QThread, Signal, QObject
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from PySide6.QtCore import Signal, QObject
+from src.services.async_runner import AsyncRunner
+from src.services.config_service import get_config
 from src.services.file_manager import FileManager
 from src.services.gpt_service import GPTService
+from src.services.logger import logger
+from src.services.request_scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE
+from src.services.result_store import ResultStore
 from src.controllers.data_controller import DataController
-from src.models.state import AppState
+from src.models.job_queue import JobQueue
+from src.models.state import AppState, build_context_str
 
 class GenerationWorker(QObject):
+    """
+    Runs one generation on the AppController's background event loop and reports back
+    through Qt signals, which Qt queues onto the GUI thread for GUI-thread receivers.
+    """
+
+    # The item plus the content type and context string of the job that produced it
+    result_ready = Signal(dict, str, str)
+    partial_result = Signal(dict)
     finished = Signal(list)
     error = Signal(str)
 
-    def __init__(self, data_controller, content_type, context_str, n_results):
+    def __init__(self, data_controller, queue, max_concurrent=2, chunk_size=10, result_store=None):
         super().__init__()
         self.data_controller = data_controller
-        self.content_type = content_type
-        self.context_str = context_str
-        self.n_results = n_results
+        self.queue = queue
+        self.result_store = result_store
+        self.max_concurrent = max_concurrent
+        self.chunk_size = chunk_size
+        # Snapshot before the run starts; the queue itself is updated from the event loop thread
+        self.target = queue.remaining
+        self.already_completed = queue.completed
+        self.cancelled = False
+        self._loop = None
+        self._task = None
+
+    def start(self, runner):
+        self._loop = runner.loop
+        future = runner.submit(self._run_async())
+        future.add_done_callback(self._on_done)
+        return future
 
-    def run(self):
+    def _on_done(self, future):
+        # Runs on the loop thread once the generation task has finished
+        if self.result_store is not None:
+            self.result_store.flush()
+        if future.cancelled():
+            # The task was cancelled from outside, e.g. by the runner shutting down; CancelledError
+            # is not an Exception, so result() would raise it out of this callback
+            self.cancelled = True
+            self.finished.emit([])
+            return
         try:
-            results = asyncio.run(self.data_controller.generate_content_async(
-                self.content_type,
-                self.context_str,
-                self.n_results
-            ))
-            if results:
-                self.finished.emit(results)
-            else:
-                self.error.emit("No results generated.")
+            results = future.result()
         except Exception as e:
             self.error.emit(str(e))
+            return
+        if results:
+            self.finished.emit(results)
+        elif self.cancelled:
+            self.finished.emit([])
+        else:
+            self.error.emit("No results generated.")
+
+    async def _run_async(self):
+        self._task = asyncio.current_task()
+        try:
+            if self.cancelled:
+                return []
+            return await self.data_controller.run_jobs_async(
+                self.queue,
+                on_result=self._on_result,
+                on_partial=self.partial_result.emit,
+                max_concurrent=self.max_concurrent,
+                chunk_size=self.chunk_size
+            )
+        finally:
+            self._task = None
+
+    def _on_result(self, job, item):
+        if self.result_store is not None:
+            self.result_store.append(
+                item, job.content_type, ", ".join(job.contexts), job.min_level, job.max_level,
+                job.category, job.schema_hash, self.queue.run_id
+            )
+        self.result_ready.emit(item, job.content_type, job.context_str())
+
+    def cancel(self):
+        """
+        Thread-safe. Cancels the running generation: in-flight requests are aborted, pending retries
+        are skipped, and whatever already validated is still delivered through `finished`.
+        """
+        self.cancelled = True
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._cancel_task)
+            except RuntimeError:
+                # The loop already shut down; nothing left to cancel
+                pass
+
+    def _cancel_task(self):
+        # Runs on the event loop. The task itself is cancelled (rather than the submitted future)
+        # so generate_content_async can still hand back its partial results.
+        if self._task is not None:
+            self._task.cancel()
+
+class StatblockNotifier(QObject):
+    """
+    Announces finished statblock requests. `ready` carries the request key and the statblock
+    (None on failure); it is emitted from the event loop thread and queued to GUI-thread receivers.
+    """
+
+    ready = Signal(str, object)
 
 class AppController:
     def __init__(self):
+        # Shared by every component; MainWindow polls it for edits and subscribers pick them up
+        self.config = get_config()
         self.file_manager = FileManager()
-        config = self.file_manager.config
         self.state = AppState()
-        self.gpt_service = GPTService()
+        self.job_queue = None
+        self.result_store = ResultStore(
+            self.config.get_str("result-store", "directory", default="./results"),
+            self.config.get_int("result-store", "segment-max-bytes", default=64 * 1024 * 1024),
+            self.config.get_int("result-store", "sync-every", default=50),
+            self.config.get_float("result-store", "sync-interval", default=1.0)
+        )
+        self.gpt_service = GPTService(self.config)
         self.data_controller = DataController(self.gpt_service, self)
+        if self.data_controller.dedup is not None:
+            # New items are also checked against what earlier sessions stored
+            self.data_controller.dedup.load_existing = self._recent_results
+        # One long-lived event loop for every LLM call, so connection pools stay warm between clicks
+        self.runner = AsyncRunner()
+        self._apply_config(self.config)
+        self.config.subscribe(self._apply_config, ("job-queue", "statblock-prefetch"))
+        self.statblock_notifier = StatblockNotifier()
+        self._statblocks = OrderedDict()
+        # key -> (future, priority) of the request in flight
+        self._statblock_requests = {}
+        self._statblock_lock = threading.Lock()
         self.categories = self.file_manager.load_categories()
         self.contexts = self.file_manager.load_contexts()
 
+    def _apply_config(self, config):
+        self.job_queue_path = config.get_str("job-queue", "path", default="./cache/job_queue.json")
+        self.split_contexts = config.get_bool("job-queue", "split-contexts", default=False)
+        self.max_concurrent_jobs = config.get_int("job-queue", "max-concurrent-jobs", default=2)
+        self.job_chunk_size = config.get_int("job-queue", "chunk-size", default=10)
+        self.statblock_prefetch_selected = config.get_bool("statblock-prefetch", "selected", default=False)
+        self.statblock_prefetch_top_k = config.get_int("statblock-prefetch", "top-k", default=0)
+        self.statblock_prefetch_delay = config.get_int("statblock-prefetch", "delay-ms", default=750)
+        self.statblock_cache_size = config.get_int("statblock-prefetch", "cache-size", default=128)
+
     def set_system(self, system):
         self.state.system = system
 
@@ -55,6 +174,9 @@ class AppController:
     def set_type(self, content_type):
         self.state.selected_type = content_type
 
+    def set_types(self, types):
+        self.state.selected_types = types
+
     def set_num_results(self, n):
         self.state.num_results = n
 
@@ -65,6 +187,9 @@ class AppController:
     def set_contexts(self, contexts):
         self.state.contexts = contexts
 
+    def set_context_groups(self, groups):
+        self.state.context_groups = groups
+
     def set_regen_options(self, name_only, lock_name):
         self.state.regenerate_name_only = name_only
         self.state.lock_name = lock_name
@@ -92,55 +217,211 @@ class AppController:
     def reload_contexts(self):
         self.contexts = self.file_manager.load_contexts()
 
-    def generate_content_async(self, on_finished, on_error):
-        if not self.state.selected_category or not self.state.selected_type:
+    def generate_content_async(self, on_finished, on_error, on_result=None, on_partial=None, resume=True):
+        if not self.state.selected_types:
             on_error("Please select a category and type before generating.")
             return
 
-        # Construct context string with grouping
-        # Example: If multiple contexts share the same parent, group them.
-        # For simplicity, here we just join them. In advanced usage, 
-        # you would find siblings and group them by their parent.
-        context_list = self.state.contexts
-        context_str = ", ".join(context_list)
-        context_str += f" for characters between level {self.state.min_level} and {self.state.max_level}"
+        # Every checked type (and, with split-contexts, every context group) becomes its own job.
+        # An unfinished run of the same selection is resumed unless `resume` is False, in which
+        # case the saved queue is overwritten and the run starts over
+        queue = self.plan_jobs()
+        saved = self.resumable_queue(queue) if resume else None
+        if saved is not None:
+            logger.info(f"Resuming job queue: {saved.completed} of {saved.total} item(s) already generated.")
+            queue = saved
+        queue.save()
+        self.job_queue = queue
 
-        self.worker_thread = QThread()
         self.worker = GenerationWorker(
-            self.data_controller,
-            self.state.selected_type,
-            context_str,
-            self.state.num_results
+            self.data_controller, queue, self.max_concurrent_jobs, self.job_chunk_size, self.result_store
         )
-        self.worker.moveToThread(self.worker_thread)
+        # Callbacks should be methods of a GUI-thread QObject so Qt queues them onto the GUI thread
+        if on_result:
+            self.worker.result_ready.connect(on_result)
+        if on_partial:
+            self.worker.partial_result.connect(on_partial)
         self.worker.finished.connect(on_finished)
         self.worker.error.connect(on_error)
-        self.worker.finished.connect(self.worker_thread.quit)
-        self.worker.error.connect(self.worker_thread.quit)
-        self.worker_thread.started.connect(self.worker.run)
-        self.worker_thread.start()
+        return self.worker.start(self.runner)
 
-    def get_full_statblock(self, base_content):
-        context_str = ", ".join(self.state.contexts)
-        context_str += f" for characters between level {self.state.min_level} and {self.state.max_level}"
-        return self.data_controller.get_full_statblock(self.state.selected_type, context_str, base_content)
+    def cancel_generation(self):
+        worker = getattr(self, "worker", None)
+        if worker is not None:
+            worker.cancel()
+
+    def resumable_queue(self, queue=None):
+        """The saved, unfinished queue of the same jobs as `queue` (default: the current selection), or None."""
+        saved = JobQueue.load(self.job_queue_path)
+        if saved is None or saved.is_finished:
+            return None
+        return saved if saved.same_plan(queue or self.plan_jobs()) else None
+
+    def plan_jobs(self):
+        groups = self.state.context_groups if self.split_contexts else [self.state.contexts]
+        return JobQueue.plan(
+            self.state.selected_types,
+            [group for group in groups if group],
+            self.state.num_results,
+            self.state.min_level,
+            self.state.max_level,
+            path=self.job_queue_path
+        )
+
+    def prefetch_schema(self):
+        """
+        Start fetching schemas for the current selection in the background so the next Generate
+        click does not wait for them. Only the jobs Generate starts with are prefetched.
+        Returns the future, or None if nothing is selected.
+        """
+        if not self.state.selected_types or not self.state.contexts:
+            return None
+        return self.runner.submit(self._prefetch_schemas_async(self.plan_jobs().jobs[:self.max_concurrent_jobs]))
+
+    async def _prefetch_schemas_async(self, jobs):
+        schema_service = self.data_controller.schema_service
+        return await asyncio.gather(*(schema_service.get_schema(job.content_type, job.context_str()) for job in jobs))
+
+    def statblock_origin(self, origin=None):
+        """
+        The (content_type, context_str) a statblock is generated under: that of the job that
+        produced the item when known, otherwise the current selection.
+        """
+        if origin:
+            return tuple(origin)
+        return self.state.selected_type, self._context_str()
+
+    def statblock_key(self, base_content, origin=None):
+        """Key for the statblock of `base_content` under its origin (see statblock_origin) and the campaign notes."""
+        content_type, context_str = self.statblock_origin(origin)
+        payload = json.dumps([
+            content_type,
+            context_str,
+            self.state.system,
+            self.state.setting,
+            self.state.campaign_prompt,
+            base_content
+        ], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cached_statblock(self, key):
+        with self._statblock_lock:
+            statblock = self._statblocks.get(key)
+            if statblock is not None:
+                self._statblocks.move_to_end(key)
+            return statblock
+
+    def request_statblock(self, base_content, origin=None, priority=PRIORITY_INTERACTIVE):
+        """
+        Start generating the statblock for `base_content` in the background and return its key.
+        The result arrives through statblock_notifier.ready. Requests for an item that is already
+        cached or in flight are not sent again, unless the new request is more urgent than the
+        one in flight (a "More Info" click on an item still queued for prefetch): then the
+        queued request is cancelled and replaced, so the click does not wait behind bulk work.
+        """
+        content_type, context_str = self.statblock_origin(origin)
+        key = self.statblock_key(base_content, (content_type, context_str))
+        superseded = None
+        with self._statblock_lock:
+            in_flight = self._statblock_requests.get(key)
+            if key in self._statblocks:
+                self._statblocks.move_to_end(key)
+                cached = self._statblocks[key]
+            elif in_flight is not None and in_flight[1] <= priority:
+                return key
+            else:
+                cached = None
+                if in_flight is not None:
+                    superseded = in_flight[0]
+                future = self.runner.submit(
+                    self.data_controller.get_full_statblock_async(content_type, context_str, base_content, priority)
+                )
+                self._statblock_requests[key] = (future, priority)
+        if cached is not None:
+            self.statblock_notifier.ready.emit(key, cached)
+            return key
+        if superseded is not None:
+            superseded.cancel()
+        future.add_done_callback(lambda done: self._on_statblock_done(key, done))
+        return key
+
+    def prefetch_statblocks(self, items, origins=None):
+        """Speculatively expand `items` (with their origins, if known) behind any interactive requests."""
+        origins = origins or [None] * len(items)
+        for base_content, origin in zip(items, origins):
+            self.request_statblock(base_content, origin, priority=PRIORITY_BULK)
+
+    def _on_statblock_done(self, key, future):
+        statblock = None
+        if not future.cancelled():
+            try:
+                statblock = future.result()
+            except Exception as e:
+                logger.error(f"Statblock request failed: {e}")
+        with self._statblock_lock:
+            in_flight = self._statblock_requests.get(key)
+            # A request replaced by a more urgent one leaves the entry to its replacement
+            superseded = in_flight is not None and in_flight[0] is not future
+            if not superseded:
+                self._statblock_requests.pop(key, None)
+            if statblock:
+                self._statblocks[key] = statblock
+                if len(self._statblocks) > self.statblock_cache_size:
+                    self._statblocks.popitem(last=False)
+        if superseded and not statblock:
+            return
+        self.statblock_notifier.ready.emit(key, statblock)
+
+    def shutdown(self):
+        self.runner.stop(cleanup=self.gpt_service.aclose())
+        self.result_store.close()
+
+    def _context_str(self):
+        return build_context_str(self.state.contexts, self.state.min_level, self.state.max_level)
+
+    def search_results(self, text="", content_type=None, context=None, level=None, limit=50, offset=0):
+        """
+        Page through every item generated so far. Returns ([(item, origin), ...], has_more), where
+        origin is the (content_type, context_str) of the job that produced the item.
+        """
+        records, has_more = self.result_store.search_records(text, content_type, context, level, limit, offset)
+        return [(record["item"], self._record_origin(record)) for record in records], has_more
+
+    def _record_origin(self, record):
+        if not record.get("type"):
+            return None
+        # Stored contexts are already joined the way build_context_str joins them
+        context = [record["context"]] if record.get("context") else []
+        return record["type"], build_context_str(context, record.get("min_level"), record.get("max_level"))
+
+    def _recent_results(self, content_type, limit):
+        return self.result_store.search(content_type=content_type, limit=limit)[0]
+
+    def stored_content_types(self):
+        return self.result_store.content_types()
 
     def export_to_logs(self, detailed=False):
-        category = self.state.selected_type or "results"
+        """
+        Export every item of the current run (including items from before a resume) in one file:
+        JSON lines for the detailed export, CSV for the table. Returns (path, item count).
+        """
+        if self.job_queue is None or not self.result_store.count(run_id=self.job_queue.run_id):
+            return None, 0
+        category = self._export_category()
+        path = self.file_manager.export_path(category, ".jsonl" if detailed else ".csv")
         if detailed:
-            for content in self.state.last_results:
-                json_str = self._to_json_str(content)
-                self.file_manager.write_to_log_file(category, json_str, detailed=True)
+            count = self.result_store.export_jsonl(path, run_id=self.job_queue.run_id)
         else:
-            if self.state.last_results:
-                keys = list(self.state.last_results[0].keys())
-                lines = [",".join(keys)]
-                for r in self.state.last_results:
-                    row = [str(r.get(k, "")) for k in keys]
-                    lines.append(",".join(row))
-                csv_data = "\n".join(lines)
-                self.file_manager.write_to_log_file(category, csv_data)
-
-    def _to_json_str(self, data):
-        import json
-        return json.dumps(data, ensure_ascii=False, indent=2)
+            count = self.result_store.export_csv(path, run_id=self.job_queue.run_id)
+        logger.info(f"Exported {count} {category} item(s) to {path}")
+        return path, count
+
+    def _export_category(self):
+        """Short name for the run's export file: its one type, else its one category, else "results"."""
+        types = {job.content_type for job in self.job_queue.jobs}
+        if len(types) == 1:
+            return types.pop()
+        categories = {job.category for job in self.job_queue.jobs}
+        if len(categories) == 1 and all(categories):
+            return categories.pop()
+        return "results"
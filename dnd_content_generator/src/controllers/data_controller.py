@@ -1,60 +1,348 @@
 import asyncio
 import json
 import random
+import time
 from jsonschema import ValidationError
-from src.models.content_parser import ContentParser
-from src.services.schema_service import SchemaService
+from src.models.content_parser import ContentParser, IncrementalJSONParser
+from src.models.job_queue import DONE, FAILED, PENDING, RUNNING
+from src.models.schema_coercion import coerce_to_schema
+from src.services.dedup import NearDuplicateFilter
+from src.services.llm_errors import LLMError
+from src.services.schema_service import SchemaService, schema_hash
 from src.services.logger import logger
-from src.services.prompt_templates import BASE_PROMPT, FULL_STATBLOCK_PROMPT
+from src.services.prompt_templates import BASE_PROMPT, BATCH_PROMPT, FIELD_REPAIR_PROMPT, FULL_STATBLOCK_PROMPT
+from src.services.request_scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE
 
 class DataController:
     def __init__(self, gpt_service, app_controller):
         self.gpt_service = gpt_service
         self.parser = ContentParser()
-        self.schema_service = SchemaService()
+        self.schema_service = SchemaService(gpt_service)
         self.app_controller = app_controller  # Reference to get campaign prompt and breadcrumb
 
-        config = self.schema_service.config
-        self.retry_count = config["app-settings"].get("llm_retry_count", 3)
-        self.retry_delay = config["app-settings"].get("llm_retry_delay", 2)
+        self.config = self.schema_service.config
+        self.partial_interval = 0.1
+        # Near-duplicate items are rejected and re-requested; accepted names are fed back into prompts.
+        # Switching it on or off takes a restart, the other dedup settings follow config reloads
+        self.dedup = None
+        if self.config.get_bool("dedup", "enable", default=False):
+            self.dedup = NearDuplicateFilter(
+                threshold=self.config.get_float("dedup", "threshold", default=0.6),
+                seed_limit=self.config.get_int("dedup", "seed-limit", default=2000)
+            )
+        self.field_repairs = 0
+        # Items kept only thanks to local repair, each one an LLM retry avoided. An item is counted
+        # once, when it is finally accepted: under JSON repair if its reply needed it, else under coercion
+        self.json_repairs = 0
+        self.schema_coercions = 0
+        self._apply_config(self.config)
+        self.config.subscribe(self._apply_config, ("app-settings", "dedup", "field-repair"))
 
-    def generate_content(self, content_type, context_str, n_results=3):
-        return asyncio.run(self.generate_content_async(content_type, context_str, n_results))
+    def _apply_config(self, config):
+        # Attempts per item. Malformed or invalid replies are retried straight away with the errors
+        # fed back into the prompt; waiting out rate limits and outages is GPTService's job
+        self.retry_count = config.get_int("app-settings", "llm_retry_count", default=3)
+        # Items requested per LLM call; 1 keeps the original one-prompt-per-item behaviour
+        self.batch_size = max(1, config.get_int("app-settings", "batch-size", default=1))
+        # Stream replies token by token so items are validated the moment their JSON closes
+        self.streaming = config.get_bool("app-settings", "streaming", default=False)
+        self.used_names_in_prompt = config.get_int("dedup", "names-in-prompt", default=30)
+        if self.dedup is not None:
+            self.dedup.threshold = config.get_float("dedup", "threshold", default=0.6)
+            self.dedup.seed_limit = config.get_int("dedup", "seed-limit", default=2000)
+        # Items failing validation on a few fields get just those fields re-requested, not a whole new item
+        self.field_repair = config.get_bool("field-repair", "enable", default=False)
+        self.field_repair_max_fields = config.get_int("field-repair", "max-fields", default=3)
+        self.field_repair_temperature = config.get_float("field-repair", "temperature", default=0.3)
 
-    async def generate_content_async(self, content_type, context_str, n_results=3):
+    @property
+    def retries_avoided(self):
+        return self.json_repairs + self.schema_coercions
+
+    def _run_sync(self, coro):
+        async def runner():
+            try:
+                return await coro
+            finally:
+                # asyncio.run discards its loop afterwards, so release that loop's connection pool too
+                await self.gpt_service.aclose()
+        return asyncio.run(runner())
+
+    def generate_content(self, content_type, context_str, n_results=3, on_result=None, on_partial=None):
+        return self._run_sync(self.generate_content_async(content_type, context_str, n_results, on_result, on_partial))
+
+    async def generate_content_async(self, content_type, context_str, n_results=3, on_result=None, on_partial=None):
+        """
+        Generate up to n_results validated items. If given, on_result is called with each
+        item as soon as it passes validation, before the rest of the batch completes.
+        When streaming, on_partial receives the name/description of items still being written.
+
+        Cancelling the task running this coroutine cancels every outstanding request and retry;
+        the items validated before the cancellation are returned instead of being lost.
+        """
+        delivered = []
+
+        def deliver(item):
+            delivered.append(item)
+            if on_result:
+                on_result(item)
+
+        try:
+            return await self._generate_content_async(content_type, context_str, n_results, deliver, on_partial)
+        except asyncio.CancelledError:
+            logger.info(f"Generation cancelled; keeping {len(delivered)} completed item(s).")
+            return delivered
+
+    async def run_jobs_async(self, queue, on_result=None, on_partial=None, on_progress=None,
+                             max_concurrent=2, chunk_size=10):
+        """
+        Work through every unfinished job in `queue`. Each job's outstanding count is split into
+        chunks of at most `chunk_size` items, and at most `max_concurrent` chunks run at once.
+        on_result(job, item) receives each validated item; on_progress(job) runs after every chunk,
+        once the job's progress has been recorded and the queue saved.
+
+        Jobs that still come up short are marked failed and stay in the queue for the next run.
+        On cancellation the queue is saved as it stands and the items delivered so far are returned.
+        """
+        semaphore = asyncio.Semaphore(max_concurrent)
+        delivered = []
+        outstanding = {}
+
+        async def run_chunk(job, count):
+            def deliver(item):
+                job.completed += 1
+                delivered.append(item)
+                if on_result:
+                    on_result(job, item)
+
+            async with semaphore:
+                job.status = RUNNING
+                try:
+                    schema = await self.schema_service.get_schema(job.content_type, job.context_str())
+                    job.schema_hash = schema_hash(schema) if schema else None
+                    await self._generate_content_async(job.content_type, job.context_str(), count, deliver, on_partial)
+                except Exception as e:
+                    logger.error(f"Job {job.id} ({job.content_type}) chunk failed: {e}")
+                outstanding[job.id] -= 1
+                if outstanding[job.id] == 0:
+                    job.status = DONE if job.remaining == 0 else FAILED
+                queue.save()
+                if on_progress:
+                    on_progress(job)
+
+        chunks = []
+        for job in queue.unfinished_jobs():
+            remaining = job.remaining
+            starts = range(0, remaining, chunk_size)
+            outstanding[job.id] = len(starts)
+            chunks.extend(run_chunk(job, min(chunk_size, remaining - start)) for start in starts)
+
+        try:
+            await asyncio.gather(*chunks)
+        except asyncio.CancelledError:
+            for job in queue.jobs:
+                if job.status == RUNNING:
+                    job.status = PENDING
+            queue.save()
+            logger.info(f"Job run cancelled; keeping {len(delivered)} completed item(s).")
+        if self.dedup is not None and self.dedup.duplicates:
+            logger.info(
+                f"Duplicate detection has rejected {self.dedup.duplicates} of {self.dedup.checked} item(s) "
+                f"this session, about {self.dedup.duplicate_tokens} tokens of output."
+            )
+        if self.retries_avoided:
+            logger.info(
+                f"Local repair has avoided {self.retries_avoided} LLM retries this session "
+                f"({self.json_repairs} JSON fix(es), {self.schema_coercions} schema coercion(s))."
+            )
+        if self.field_repairs:
+            logger.info(f"Field-level repair has saved {self.field_repairs} item(s) from full regeneration this session.")
+        cache = self.gpt_service.response_cache
+        if cache is not None and cache.hits:
+            logger.info(
+                f"Response cache has answered {cache.hits} of {cache.hits + cache.misses} cacheable request(s) this session."
+            )
+        return delivered
+
+    async def _generate_content_async(self, content_type, context_str, n_results, on_result, on_partial):
         schema = await self.schema_service.get_schema(content_type, context_str)
         if not schema:
             logger.error("No valid schema available. Cannot generate content.")
             return []
+        if self.dedup is not None:
+            await self.dedup.prepare(content_type)
+
+        base_prompt = self._build_generation_prompt(BASE_PROMPT, content_type, context_str, schema)
+
+        if self.batch_size > 1 and n_results > 1:
+            return await self._generate_batched_async(
+                content_type, context_str, schema, n_results, base_prompt, on_result, on_partial
+            )
+
+        tasks = [
+            self._generate_one_async(base_prompt, schema, on_result, on_partial, content_type)
+            for _ in range(n_results)
+        ]
+        results = await asyncio.gather(*tasks)
+        return [r for r in results if r is not None]
+
+    async def _generate_one_async(self, base_prompt, schema, on_result, on_partial=None, content_type=None):
+        result = await self._attempt_content_generation_async(base_prompt, schema, on_partial, content_type)
+        if result is not None and on_result:
+            on_result(result)
+        return result
 
+    def _build_generation_prompt(self, template, content_type, context_str, schema, **extra):
         breadcrumb = getattr(self.app_controller.state, 'breadcrumb', '')
         breadcrumb_str = f"Selected category/type hierarchy: {breadcrumb}" if breadcrumb else ""
         campaign_text = self.app_controller.state.campaign_prompt.strip()
         system = self.app_controller.state.system.strip()
         setting = self.app_controller.state.setting.strip()
 
-        base_prompt = BASE_PROMPT.format(
+        prompt = template.format(
             system=system if system else "D&D 3.5e",
             setting=setting if setting else "a generic fantasy setting",
             content_type=content_type,
             context=context_str,
-            schema=json.dumps(schema)
+            schema=json.dumps(schema),
+            **extra
         )
 
         if breadcrumb_str:
-            base_prompt += "\n\n" + breadcrumb_str
+            prompt += "\n\n" + breadcrumb_str
         if campaign_text:
-            base_prompt += "\n\n" + campaign_text
+            prompt += "\n\n" + campaign_text
+        return prompt
 
-        tasks = [self._attempt_content_generation_async(base_prompt, schema) for _ in range(n_results)]
-        results = await asyncio.gather(*tasks)
-        return [r for r in results if r is not None]
+    async def _generate_batched_async(self, content_type, context_str, schema, n_results, base_prompt,
+                                      on_result=None, on_partial=None):
+        """
+        Ask for up to batch_size items per LLM call. Anything the batches still owe after
+        their retries is generated through the per-item path.
+        """
+        batch_counts = [min(self.batch_size, n_results - start) for start in range(0, n_results, self.batch_size)]
+        tasks = [
+            self._attempt_batch_generation_async(content_type, context_str, schema, count, on_result, on_partial)
+            for count in batch_counts
+        ]
+        results = [item for batch in await asyncio.gather(*tasks) for item in batch]
+
+        missing = n_results - len(results)
+        if missing > 0:
+            logger.warning(f"Batched generation came up {missing} item(s) short; falling back to per-item prompts.")
+            tasks = [
+                self._generate_one_async(base_prompt, schema, on_result, on_partial, content_type)
+                for _ in range(missing)
+            ]
+            results.extend(r for r in await asyncio.gather(*tasks) if r is not None)
+        return results
+
+    async def _attempt_batch_generation_async(self, content_type, context_str, schema, count,
+                                              on_result=None, on_partial=None):
+        valid = []
+        error_messages = []
+        invalid = []
+
+        def keep(index, normalized, json_repaired=False, coerced=False):
+            duplicate_of = self._find_duplicate(content_type, normalized)
+            if duplicate_of is not None:
+                logger.warning(f"Batch element {index+1} duplicates '{duplicate_of}'; requesting another.")
+                error_messages.append(f"'{normalized.get('Name', '')}' was too similar to '{duplicate_of}'.")
+                return False
+            self._count_local_repair(json_repaired, coerced)
+            valid.append(normalized)
+            if on_result:
+                on_result(normalized)
+            return True
+
+        def accept(index, data, json_repaired=False):
+            try:
+                checked, coerced = self._validate_data(schema, data)
+            except ValidationError as ve:
+                logger.error(f"Batch element {index+1} failed validation (attempt {attempt+1}/{self.retry_count}): {ve.message}")
+                invalid.append((index, data, ve.message))
+                return False
+            return keep(index, self._normalize_data(checked, schema), json_repaired, coerced)
+
+        for attempt in range(self.retry_count):
+            wanted = count - len(valid)
+            # Only the elements that failed are requested again
+            prompt = self._build_generation_prompt(BATCH_PROMPT, content_type, context_str, schema, count=wanted)
+            if self.dedup is not None:
+                prompt += self._used_names_note(content_type)
+            elif valid:
+                prompt += "\n\n# Already generated, do not repeat:\n" + "\n".join(item.get("Name", "") for item in valid)
+            if error_messages:
+                prompt += "\n\n# Errors so far:\n" + "\n".join(error_messages)
+
+            temp = random.uniform(0.45, 0.85)
+
+            if self.streaming:
+                # Elements are validated (and delivered) as soon as each one's closing brace arrives
+                received = []
 
+                def on_element(data, json_repaired):
+                    accept(len(received), data, json_repaired)
+                    received.append(data)
+
+                try:
+                    await self._stream_json_async(prompt, temp, on_element, on_partial, limit=wanted)
+                except LLMError as e:
+                    logger.error(f"Giving up on batch after LLM error: {e}")
+                    break
+                if not received:
+                    logger.error(f"Streamed batch reply was empty or malformed (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("Failed to parse JSON array.")
+                    continue
+                n_items = len(received)
+            else:
+                try:
+                    response = await self.gpt_service.send_prompt_async(prompt, temp, use_cache=False)
+                except LLMError as e:
+                    logger.error(f"Giving up on batch after LLM error: {e}")
+                    break
+                if not response:
+                    logger.error(f"Empty reply from LLM for batch (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("No response from LLM.")
+                    continue
+
+                repaired_before = self.parser.repaired
+                items = self.parser.parse_json_array(response)
+                reply_repaired = self.parser.repaired > repaired_before
+                if not items:
+                    logger.error(f"Failed to parse JSON array for batch (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("Failed to parse JSON array.")
+                    continue
+
+                for index, data in enumerate(items[:wanted]):
+                    # Repairing the reply saved one retry, credited to the first element it yields
+                    if accept(index, data, reply_repaired):
+                        reply_repaired = False
+                n_items = len(items)
+
+            if invalid:
+                # Patch the failing fields of each invalid element instead of regenerating it
+                patched = await asyncio.gather(*(
+                    self._repair_fields_async(content_type, schema, data) for _, data, _ in invalid
+                ))
+                for (index, _, message), data in zip(invalid, patched):
+                    if data is not None:
+                        keep(index, self._normalize_data(data, schema))
+                    else:
+                        error_messages.append(f"Validation error: {message}")
+                invalid.clear()
+
+            if len(valid) >= count:
+                break
+            if n_items < wanted:
+                error_messages.append(f"Only {n_items} of {wanted} requested objects were returned.")
+
+        return valid
 
     def get_full_statblock(self, content_type, context_str, base_content):
-        return asyncio.run(self.get_full_statblock_async(content_type, context_str, base_content))
+        return self._run_sync(self.get_full_statblock_async(content_type, context_str, base_content))
 
-    async def get_full_statblock_async(self, content_type, context_str, base_content):
+    async def get_full_statblock_async(self, content_type, context_str, base_content, priority=PRIORITY_INTERACTIVE):
         schema = await self.schema_service.get_schema(content_type, context_str)
         if not schema:
             logger.error("No valid schema available for statblock generation.")
@@ -89,63 +377,238 @@ class DataController:
             if error_messages:
                 prompt += "\n\n# Errors so far:\n" + "\n".join(error_messages)
 
-            response = await self.gpt_service.send_prompt_async(prompt)
+            try:
+                response = await self.gpt_service.send_prompt_async(prompt, priority=priority)
+            except LLMError as e:
+                logger.error(f"Giving up on statblock after LLM error: {e}")
+                return None
             if response:
+                repaired_before = self.parser.repaired
                 data = self.parser.parse_json(response)
                 if data:
                     try:
-                        self.schema_service.validate_data(schema, data)
-                        normalized = self._normalize_data(data, schema)
-                        return normalized
+                        checked, coerced = self._validate_data(schema, data)
+                        self._count_local_repair(self.parser.repaired > repaired_before, coerced)
+                        return self._normalize_data(checked, schema)
                     except ValidationError as ve:
                         logger.error(f"Statblock validation failed (attempt {attempt+1}): {ve.message}")
+                        patched = await self._repair_fields_async(content_type, schema, data, priority)
+                        if patched is not None:
+                            return self._normalize_data(patched, schema)
                         error_messages.append(f"Validation error: {ve.message}")
+                        await self.gpt_service.discard_cached_async(prompt)
                 else:
                     logger.error(f"Failed to parse JSON for statblock (attempt {attempt+1}).")
                     error_messages.append("Failed to parse JSON.")
+                    await self.gpt_service.discard_cached_async(prompt)
             else:
-                logger.error(f"No response from LLM for statblock (attempt {attempt+1}).")
+                logger.error(f"Empty reply from LLM for statblock (attempt {attempt+1}).")
                 error_messages.append("No response from LLM.")
 
-            await asyncio.sleep(self.retry_delay)
-
         logger.error("Failed to generate a valid statblock after all retries.")
         return None
 
-    async def _attempt_content_generation_async(self, base_prompt, schema):
+    async def _stream_json_async(self, prompt, temp, on_element, on_partial=None, limit=None):
+        """
+        Stream a reply through IncrementalJSONParser, handing each complete top-level object
+        (or array element, including those of an {"items": [...]} wrapper) to on_element(element, repaired),
+        `repaired` being whether it only decoded after local JSON repair. Stops early once `limit`
+        elements have arrived, the value is complete, or the reply turns out to be malformed.
+        """
+        parser = IncrementalJSONParser()
+        count = 0
+        last_partial = None
+        last_partial_at = 0.0
+        stream = self.gpt_service.stream_prompt_async(prompt, temp, use_cache=False)
+        try:
+            async for chunk in stream:
+                for element, repaired in parser.feed(chunk):
+                    if isinstance(element, dict):
+                        count += 1
+                        on_element(element, repaired)
+                if parser.malformed:
+                    logger.error("Abandoning malformed streamed reply.")
+                    break
+                if parser.done or (limit and count >= limit):
+                    break
+                if on_partial:
+                    partial = parser.partial_fields()
+                    now = time.monotonic()
+                    if partial and partial != last_partial and now - last_partial_at >= self.partial_interval:
+                        last_partial, last_partial_at = partial, now
+                        on_partial(partial)
+        finally:
+            # Closing the generator aborts the HTTP request so abandoned tokens are not paid for
+            await stream.aclose()
+
+    async def _attempt_content_generation_async(self, base_prompt, schema, on_partial=None, content_type=None):
         error_messages = []
         for attempt in range(self.retry_count):
-            prompt = base_prompt
+            prompt = base_prompt + self._used_names_note(content_type)
             if error_messages:
                 prompt += "\n\n# Errors so far:\n" + "\n".join(error_messages)
 
             temp = random.uniform(0.45, 0.85)
 
-            response = await self.gpt_service.send_prompt_async(prompt, temp)
-            if not response:
-                logger.error(f"No response from LLM (attempt {attempt+1}/{self.retry_count}).")
-                error_messages.append("No response from LLM.")
-                await asyncio.sleep(self.retry_delay)
-                continue
+            if self.streaming:
+                received = []
+                try:
+                    await self._stream_json_async(
+                        prompt, temp, lambda element, repaired: received.append((element, repaired)), on_partial, limit=1
+                    )
+                except LLMError as e:
+                    logger.error(f"Giving up on item after LLM error: {e}")
+                    return None
+                data, json_repaired = received[0] if received else (None, False)
+                if not data:
+                    logger.error(f"Streamed reply was empty or malformed (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("Failed to parse JSON.")
+                    continue
+            else:
+                # Items are meant to be diverse, so never replay a cached reply here
+                try:
+                    response = await self.gpt_service.send_prompt_async(prompt, temp, use_cache=False)
+                except LLMError as e:
+                    logger.error(f"Giving up on item after LLM error: {e}")
+                    return None
+                if not response:
+                    logger.error(f"Empty reply from LLM (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("No response from LLM.")
+                    continue
 
-            data = self.parser.parse_json(response)
-            if not data:
-                logger.error(f"Failed to parse JSON (attempt {attempt+1}/{self.retry_count}).")
-                error_messages.append("Failed to parse JSON.")
-                await asyncio.sleep(self.retry_delay)
-                continue
+                repaired_before = self.parser.repaired
+                data = self.parser.parse_json(response)
+                json_repaired = self.parser.repaired > repaired_before
+                if not data:
+                    logger.error(f"Failed to parse JSON (attempt {attempt+1}/{self.retry_count}).")
+                    error_messages.append("Failed to parse JSON.")
+                    continue
 
             try:
-                self.schema_service.validate_data(schema, data)
-                normalized = self._normalize_data(data, schema)
-                return normalized
+                valid, coerced = self._validate_data(schema, data)
             except ValidationError as ve:
                 logger.error(f"Validation failed (attempt {attempt+1}/{self.retry_count}): {ve.message}")
-                error_messages.append(f"Validation error: {ve.message}")
-                await asyncio.sleep(self.retry_delay)
+                valid = await self._repair_fields_async(content_type, schema, data)
+                if valid is None:
+                    error_messages.append(f"Validation error: {ve.message}")
+                    continue
+                # Saved by the LLM patching fields, which field_repairs counts, not by local repair
+                json_repaired = coerced = False
+            normalized = self._normalize_data(valid, schema)
+
+            duplicate_of = self._find_duplicate(content_type, normalized)
+            if duplicate_of is None:
+                self._count_local_repair(json_repaired, coerced)
+                return normalized
+            logger.warning(f"Generated item duplicates '{duplicate_of}' (attempt {attempt+1}/{self.retry_count}).")
+            error_messages.append(f"'{normalized.get('Name', '')}' was too similar to '{duplicate_of}'.")
 
         return None
 
+    def _validate_data(self, schema, data):
+        """
+        Return (`data`, False) if it validates against `schema`, else (its coerce_to_schema repair,
+        True) if that validates. Raises the repaired data's ValidationError when neither does.
+        """
+        try:
+            self.schema_service.validate_data(schema, data)
+            return data, False
+        except ValidationError as original:
+            if not isinstance(data, dict):
+                raise
+            logger.debug(f"Validation failed, trying local repair: {original.message}")
+        repaired = coerce_to_schema(schema, data)
+        self.schema_service.validate_data(schema, repaired)
+        logger.info("Repaired an invalid item locally instead of asking the LLM again.")
+        return repaired, True
+
+    def _count_local_repair(self, json_repaired, coerced):
+        """Record an accepted item that needed local repair, once even if it needed both kinds."""
+        if json_repaired:
+            self.json_repairs += 1
+        elif coerced:
+            self.schema_coercions += 1
+
+    def _failing_fields(self, schema, data):
+        """
+        Map each top-level property behind a validation error of `data` to its error messages.
+        Returns None if some error is not tied to a single property.
+        """
+        fields = {}
+        for error in self.schema_service.get_validator(schema).iter_errors(data):
+            if error.absolute_path:
+                names = [error.absolute_path[0]]
+            elif error.validator == "required":
+                names = [name for name in error.validator_value if name not in data]
+            else:
+                return None
+            for name in names:
+                messages = fields.setdefault(name, [])
+                if error.message not in messages:
+                    messages.append(error.message)
+        return fields
+
+    async def _repair_fields_async(self, content_type, schema, data, priority=PRIORITY_BULK):
+        """
+        Send only the fields of `data` that fail validation, their errors and the rest of the
+        object back to the model, and merge the corrected fields into `data`. Returns the
+        validated item, or None if the failure is not confined to a few fields or the patch
+        does not fix it, in which case the caller regenerates the item.
+        """
+        if not self.field_repair or not isinstance(data, dict):
+            return None
+        data = coerce_to_schema(schema, data)
+        failing = self._failing_fields(schema, data)
+        if not failing or len(failing) > self.field_repair_max_fields:
+            return None
+
+        properties = schema.get("properties", {})
+        field_schemas = {name: properties.get(name, {}) for name in failing}
+        prompt = FIELD_REPAIR_PROMPT.format(
+            content_type=content_type or "item",
+            data=json.dumps(data, ensure_ascii=False),
+            fields=json.dumps(field_schemas, ensure_ascii=False),
+            errors="\n".join(f"- {name}: {message}" for name, messages in failing.items() for message in messages)
+        )
+        try:
+            response = await self.gpt_service.send_prompt_async(
+                prompt, self.field_repair_temperature, priority=priority, use_cache=False
+            )
+        except LLMError as e:
+            logger.error(f"Field repair request failed: {e}")
+            return None
+        patch = self.parser.parse_json(response) if response else None
+        if not isinstance(patch, dict):
+            logger.error("Field repair reply was not a JSON object.")
+            return None
+
+        # Coercing against just the failing fields maps the reply's keys onto them and drops anything else
+        patch = coerce_to_schema(
+            {"type": "object", "properties": field_schemas, "additionalProperties": False}, patch
+        )
+        repaired = coerce_to_schema(schema, {**data, **patch})
+        try:
+            self.schema_service.validate_data(schema, repaired)
+        except ValidationError as ve:
+            logger.error(f"Field repair did not fix the item: {ve.message}")
+            return None
+        self.field_repairs += 1
+        logger.info(f"Repaired field(s) {', '.join(map(str, failing))} with a ~{len(prompt) // 4}-token prompt.")
+        return repaired
+
+    def _find_duplicate(self, content_type, item):
+        if self.dedup is None or content_type is None:
+            return None
+        return self.dedup.check(content_type, item)
+
+    def _used_names_note(self, content_type):
+        if self.dedup is None or content_type is None:
+            return ""
+        names = self.dedup.used_names(content_type, self.used_names_in_prompt)
+        if not names:
+            return ""
+        return "\n\n# Names already used, create something clearly different:\n" + "\n".join(names)
+
     def _normalize_data(self, data, schema):
         properties = schema.get("properties", {})
         ordered_props = sorted(properties.items(), key=lambda x: x[1]["ui_order"])
@@ -6,6 +6,7 @@ from src.ui.main_window import MainWindow
 def main():
     app_controller = AppController()
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(app_controller.shutdown)
     window = MainWindow(app_controller)
     window.show()
     sys.exit(app.exec())
@@ -2,7 +2,79 @@ import json
 import re
 from src.services.logger import logger
 
+PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _closes_string(text, i):
+    """True if the quote at text[i] ends a string, i.e. is followed by structure rather than more prose."""
+    j = i + 1
+    while j < len(text) and text[j] in " \t\r\n":
+        j += 1
+    return j == len(text) or text[j] in ",:}]"
+
+
+def repair_json(text):
+    """
+    Rewrite common LLM near-misses into valid JSON: single-quoted strings, raw newlines and
+    other control characters inside strings, unescaped quotes inside a value, trailing
+    commas and Python's True/False/None. Only worth calling on text json.loads rejected.
+    """
+    out = []
+    quote = None
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if quote:
+            if ch == '\\':
+                escaped = text[i + 1:i + 2]
+                # \' is not a JSON escape; inside a (now double-quoted) string it is just a quote
+                out.append("'" if escaped == "'" else ch + escaped)
+                i += 2
+                continue
+            if ch == quote and _closes_string(text, i):
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == '\n':
+                out.append('\\n')
+            elif ch == '\r':
+                out.append('\\r')
+            elif ch == '\t':
+                out.append('\\t')
+            elif ord(ch) < 0x20:
+                out.append(f"\\u{ord(ch):04x}")
+            else:
+                out.append(ch)
+        elif ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch == ',':
+            j = i + 1
+            while j < n and text[j].isspace():
+                j += 1
+            if j == n or text[j] not in "}]":
+                out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(PYTHON_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
 class ContentParser:
+    def __init__(self):
+        # Replies that only parsed after repair_json, whether or not their items then validated
+        self.repaired = 0
+
     def parse_json(self, raw_text):
         # Attempt to clean the input from Markdown code fences and other extraneous formatting.
         cleaned = self._strip_code_fences(raw_text)
@@ -19,10 +91,42 @@ class ContentParser:
             if data is not None:
                 return data
 
+        # Near-valid JSON is fixed locally rather than asking the model again
+        data = self._try_repaired_json(extracted or cleaned)
+        if data is not None:
+            return data
+
         # If still no success, log and return None
         logger.error(f"Failed to parse JSON after extraction attempts.\nOriginal Data:\n{raw_text}")
         return None
 
+    def parse_json_array(self, raw_text):
+        """
+        Parse a reply that should contain a JSON array of objects.
+        A single object, or an object wrapping the array in its only list value, is also accepted.
+        Returns a list, or None if nothing usable was found.
+        """
+        cleaned = self._strip_code_fences(raw_text)
+
+        data = self._try_parse_json(cleaned)
+        if data is None:
+            extracted = self._extract_json_array(cleaned)
+            if extracted:
+                data = self._try_parse_json(extracted)
+                if data is None:
+                    data = self._try_repaired_json(extracted)
+        if data is None:
+            data = self.parse_json(cleaned)
+
+        if isinstance(data, list):
+            return data
+        if isinstance(data, dict):
+            list_values = [v for v in data.values() if isinstance(v, list)]
+            if len(list_values) == 1 and list_values[0] and all(isinstance(i, dict) for i in list_values[0]):
+                return list_values[0]
+            return [data]
+        return None
+
     def _strip_code_fences(self, text):
         # Remove ```json ... ``` and ``` ... ```
         pattern = r"```(?:json)?\s*(.*?)\s*```"
@@ -36,6 +140,13 @@ class ContentParser:
             logger.debug(f"JSON decode attempt failed: {e}")
             return None
 
+    def _try_repaired_json(self, text):
+        data = self._try_parse_json(repair_json(text))
+        if data is not None:
+            self.repaired += 1
+            logger.info("Repaired malformed JSON locally.")
+        return data
+
     def _extract_json_object(self, text):
         # Attempt to find the first balanced { ... } section
         start = text.find('{')
@@ -44,3 +155,171 @@ class ContentParser:
             candidate = text[start:end+1].strip()
             return candidate
         return None
+
+    def _extract_json_array(self, text):
+        # Attempt to find the outermost [ ... ] section
+        start = text.find('[')
+        end = text.rfind(']')
+        if start != -1 and end != -1 and start < end:
+            return text[start:end+1].strip()
+        return None
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON reply while it streams in.
+
+    feed() returns every top-level object (or, for a top-level array, every object element)
+    whose closing brace has arrived, as (element, repaired) pairs where `repaired` says the
+    element only decoded after repair_json. An object whose first value is an array of objects,
+    such as {"items": [{...}]}, is treated as a wrapper: the objects inside that array are the
+    elements, as parse_json_array would unwrap them. A wrapper that closes without yielding any
+    is returned whole. `malformed` turns true as soon as the reply can no
+    longer be valid JSON, so the caller can abort the stream instead of paying for the rest of
+    it. `done` turns true once the top-level value is complete.
+
+    Only the text of the element in progress is kept, as a list of chunks joined once it
+    completes, so a long stream costs linear time.
+    """
+
+    OPENERS = {'{': '}', '[': ']'}
+
+    def __init__(self, max_preamble=200):
+        self.max_preamble = max_preamble
+        self.malformed = False
+        self.done = False
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._preamble = 0
+        # Stack depth at which elements open: the top-level object itself, a top-level array's
+        # items, or the items of a wrapper object's array
+        self._element_parent = None
+        self._top_keys = 0
+        # Chunks of the element in progress, None between elements
+        self._element_parts = None
+        # Set by a top-level object's first value opening an array; the array's first
+        # non-space character decides whether the object is a wrapper
+        self._maybe_wrapper = False
+        # Chunks of a wrapper object, kept until its first element completes
+        self._wrapper_parts = None
+        self.repaired = 0
+
+    def feed(self, chunk):
+        completed = []
+        if self.malformed or self.done:
+            return completed
+        # Where the element in progress (and an unconfirmed wrapper) starts within this chunk
+        start = wrapper_start = 0
+        for i, ch in enumerate(chunk):
+            if self._maybe_wrapper and not ch.isspace():
+                self._maybe_wrapper = False
+                if ch == '{':
+                    # {"items": [{...}]}: the objects in the array are the elements, not the wrapper
+                    self._wrapper_parts = self._element_parts
+                    self._wrapper_parts.append(chunk[start:i])
+                    wrapper_start = i
+                    self._element_parent = ['}', ']']
+            if not self._started:
+                if self._scan_preamble(ch):
+                    start = i
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == ':' and self._stack == ['}']:
+                self._top_keys += 1
+            elif ch in self.OPENERS:
+                if ch == '{' and self._stack == self._element_parent:
+                    self._element_parts = []
+                    start = i
+                elif ch == '[' and self._element_parent == [] and self._stack == ['}'] and self._top_keys == 1:
+                    self._maybe_wrapper = True
+                self._stack.append(self.OPENERS[ch])
+            elif ch in '}]':
+                if not self._stack or self._stack.pop() != ch:
+                    self.malformed = True
+                    return completed
+                if self._element_parts is not None and self._stack == self._element_parent:
+                    self._element_parts.append(chunk[start:i + 1])
+                    decoded = self._decode("".join(self._element_parts))
+                    self._element_parts = None
+                    if decoded is None:
+                        return completed
+                    completed.append(decoded)
+                    self._wrapper_parts = None
+                if not self._stack:
+                    if self._wrapper_parts is not None:
+                        self._wrapper_parts.append(chunk[wrapper_start:i + 1])
+                        decoded = self._decode("".join(self._wrapper_parts))
+                        self._wrapper_parts = None
+                        if decoded is not None:
+                            completed.append(decoded)
+                    self.done = True
+                    return completed
+            if self.malformed:
+                return completed
+        if self._element_parts is not None:
+            self._element_parts.append(chunk[start:])
+        if self._wrapper_parts is not None:
+            self._wrapper_parts.append(chunk[wrapper_start:])
+        return completed
+
+    def partial_fields(self, fields=("name", "description")):
+        """
+        Best-effort view of string fields of the element currently streaming, including a
+        value that is still being written. Useful for previews only.
+        """
+        if self._element_parts is None:
+            return {}
+        current = "".join(self._element_parts)
+        partial = {}
+        for field in fields:
+            match = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)("?)' % re.escape(field), current)
+            if not match:
+                continue
+            raw = match.group(1)
+            if raw.endswith('\\') and not raw.endswith('\\\\'):
+                raw = raw[:-1]
+            try:
+                partial[field] = json.loads('"' + raw + '"')
+            except json.JSONDecodeError:
+                partial[field] = raw
+        return partial
+
+    def _scan_preamble(self, ch):
+        """Returns True if `ch` opens the top-level object, which is the first element until it turns out to be a wrapper."""
+        if ch in self.OPENERS:
+            self._started = True
+            self._stack.append(self.OPENERS[ch])
+            if ch == '{':
+                self._element_parent = []
+                self._element_parts = []
+                return True
+            self._element_parent = [']']
+        elif not ch.isspace():
+            # Tolerate a code fence or a short lead-in, but not a reply that never gets to JSON
+            self._preamble += 1
+            if self._preamble > self.max_preamble:
+                logger.debug("Streamed reply has no JSON after the allowed preamble.")
+                self.malformed = True
+        return False
+
+    def _decode(self, candidate):
+        try:
+            return json.loads(candidate), False
+        except json.JSONDecodeError as e:
+            logger.debug(f"Streamed element failed to decode: {e}")
+        try:
+            element = json.loads(repair_json(candidate))
+        except json.JSONDecodeError:
+            self.malformed = True
+            return None
+        self.repaired += 1
+        return element, True
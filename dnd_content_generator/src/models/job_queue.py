@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import uuid
+from src.models.state import build_context_str
+from src.services.logger import logger
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class Job:
+    """One content type under one group of contexts, with its target and progress."""
+
+    def __init__(self, content_type, contexts, count, min_level=1, max_level=3, category="", job_id=None,
+                 completed=0, status=PENDING):
+        self.category = category
+        self.content_type = content_type
+        self.contexts = list(contexts)
+        self.min_level = min_level
+        self.max_level = max_level
+        self.count = count
+        self.completed = completed
+        self.status = status
+        self.id = job_id or self.make_id(content_type, self.contexts, min_level, max_level)
+        # Hash of the schema the items were validated against; set while the job runs
+        self.schema_hash = None
+
+    @staticmethod
+    def make_id(content_type, contexts, min_level, max_level):
+        """Derived from what the job generates, so the same selection maps to the same job."""
+        payload = json.dumps([content_type, list(contexts), min_level, max_level], ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def remaining(self):
+        return max(self.count - self.completed, 0)
+
+    def context_str(self):
+        return build_context_str(self.contexts, self.min_level, self.max_level)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "category": self.category,
+            "type": self.content_type,
+            "contexts": self.contexts,
+            "min_level": self.min_level,
+            "max_level": self.max_level,
+            "count": self.count,
+            "completed": self.completed,
+            "status": self.status
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["type"],
+            data["contexts"],
+            data["count"],
+            data.get("min_level", 1),
+            data.get("max_level", 3),
+            data.get("category", ""),
+            data.get("id"),
+            data.get("completed", 0),
+            data.get("status", PENDING)
+        )
+
+
+class JobQueue:
+    """
+    Ordered list of generation jobs with per-job status and completed counts.
+
+    With a `path` the queue is saved to disk (write then rename) so an interrupted run can
+    be picked up where it stopped; without one it only lives in memory.
+    """
+
+    VERSION = 1
+
+    def __init__(self, jobs=None, path=None, run_id=None):
+        self.jobs = list(jobs or [])
+        self.path = path
+        # Identifies the run in the result store; kept when an interrupted run is resumed
+        self.run_id = run_id or uuid.uuid4().hex
+
+    @classmethod
+    def plan(cls, types, context_groups, count, min_level=1, max_level=3, path=None):
+        """
+        One job per (category, type) pair and context group, each generating `count` items.
+        `types` is a list of (category, type) tuples; `context_groups` a list of context lists.
+        """
+        jobs = []
+        seen = set()
+        for category, content_type in types:
+            for contexts in context_groups:
+                job = Job(content_type, contexts, count, min_level, max_level, category)
+                if job.id not in seen:
+                    seen.add(job.id)
+                    jobs.append(job)
+        return cls(jobs, path)
+
+    @classmethod
+    def load(cls, path):
+        """Return the saved queue at `path`, or None if there is none or it cannot be read."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable job queue {path}: {e}")
+            return None
+        if data.get("version") != cls.VERSION:
+            return None
+        jobs = [Job.from_dict(entry) for entry in data.get("jobs", [])]
+        for job in jobs:
+            # A job that was running when the app stopped goes back into the queue
+            if job.status == RUNNING:
+                job.status = PENDING
+        return cls(jobs, path, data.get("run_id"))
+
+    def save(self):
+        if not self.path:
+            return
+        data = {"version": self.VERSION, "run_id": self.run_id, "jobs": [job.to_dict() for job in self.jobs]}
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save job queue {self.path}: {e}")
+
+    def same_plan(self, other):
+        """True if both queues hold the same jobs with the same targets, regardless of progress."""
+        return [(job.id, job.count) for job in self.jobs] == [(job.id, job.count) for job in other.jobs]
+
+    def unfinished_jobs(self):
+        return [job for job in self.jobs if job.status != DONE and job.remaining > 0]
+
+    @property
+    def is_finished(self):
+        return not self.unfinished_jobs()
+
+    @property
+    def total(self):
+        return sum(job.count for job in self.jobs)
+
+    @property
+    def completed(self):
+        return sum(min(job.completed, job.count) for job in self.jobs)
+
+    @property
+    def remaining(self):
+        return sum(job.remaining for job in self.jobs)
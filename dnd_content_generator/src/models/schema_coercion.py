@@ -0,0 +1,138 @@
+import re
+
+_FAILED = object()
+_INTEGER = re.compile(r"^[+-]?\d+(\.0*)?$")
+_NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+# "1,250" or "-12,000.5"; any other comma (a decimal comma such as "1,5") is left uncast
+_THOUSANDS = re.compile(r"^[+-]?\d{1,3}(,\d{3})+(\.\d+)?$")
+_TRUE = {"true", "yes", "y", "1"}
+_FALSE = {"false", "no", "n", "0"}
+
+
+def coerce_to_schema(schema, data):
+    """
+    Return a copy of `data` with the near-misses a model typically makes fixed against
+    `schema`: keys matched to property names regardless of case and separators, unknown keys
+    dropped when additionalProperties is false, scalars cast to the declared type (e.g. "12"
+    to 12, 3 to "3", "fire, cold" to ["fire", "cold"]), enum values matched regardless of case,
+    and properties put in ui_order. Anything it cannot fix is left for validation to report.
+    """
+    return _coerce(schema, data)
+
+
+def _types(schema):
+    declared = schema.get("type")
+    if declared is None:
+        return []
+    return [declared] if isinstance(declared, str) else list(declared)
+
+
+def _coerce(schema, value):
+    if not isinstance(schema, dict):
+        return value
+    types = _types(schema)
+    if isinstance(value, dict) and (not types or "object" in types):
+        return _coerce_object(schema, value)
+
+    if types and not any(_matches(value, t) for t in types):
+        for t in types:
+            cast = _cast(schema, value, t)
+            if cast is not _FAILED:
+                value = cast
+                break
+
+    if isinstance(value, list) and isinstance(schema.get("items"), dict):
+        value = [_coerce(schema["items"], element) for element in value]
+
+    enum = schema.get("enum")
+    if enum and value not in enum and isinstance(value, str):
+        folded = value.strip().lower()
+        for option in enum:
+            if isinstance(option, str) and option.lower() == folded:
+                value = option
+                break
+    return value
+
+
+def _key(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+def _coerce_object(schema, value):
+    properties = schema.get("properties", {})
+    lookup = {_key(name): name for name in properties}
+    result = {}
+    # Exact keys first, so "name" wins over a stray "Name"
+    for key in sorted(value, key=lambda k: k not in properties):
+        name = key if key in properties else lookup.get(_key(key))
+        if name is None:
+            if schema.get("additionalProperties", True) is not False:
+                result[key] = value[key]
+            continue
+        if name not in result:
+            result[name] = _coerce(properties[name], value[key])
+
+    def position(key):
+        prop = properties.get(key)
+        order = prop.get("ui_order") if isinstance(prop, dict) else None
+        return order if isinstance(order, int) else len(properties) + 1
+
+    return {key: result[key] for key in sorted(result, key=position)}
+
+
+def _matches(value, json_type):
+    if json_type == "string":
+        return isinstance(value, str)
+    if json_type == "integer":
+        return isinstance(value, int) and not isinstance(value, bool)
+    if json_type == "number":
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+    if json_type == "boolean":
+        return isinstance(value, bool)
+    if json_type == "array":
+        return isinstance(value, list)
+    if json_type == "object":
+        return isinstance(value, dict)
+    if json_type == "null":
+        return value is None
+    return True
+
+
+def _cast(schema, value, json_type):
+    if json_type == "string":
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+            return ", ".join(str(v) for v in value)
+    elif json_type in ("integer", "number"):
+        if isinstance(value, bool):
+            return _FAILED
+        if isinstance(value, float) and json_type == "integer":
+            return int(value) if value.is_integer() else _FAILED
+        if isinstance(value, str):
+            text = value.strip()
+            if _THOUSANDS.match(text):
+                text = text.replace(",", "")
+            if _INTEGER.match(text):
+                return int(float(text))
+            if json_type == "number" and _NUMBER.match(text):
+                return float(text)
+    elif json_type == "boolean":
+        if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+            return value.strip().lower() in _TRUE
+        if isinstance(value, int) and value in (0, 1):
+            return bool(value)
+    elif json_type == "array":
+        if isinstance(value, str):
+            items = schema.get("items", {})
+            if isinstance(items, dict) and "string" in _types(items):
+                return [part.strip() for part in value.split(",") if part.strip()]
+            return [value]
+        if value is not None and not isinstance(value, dict):
+            return [value]
+    elif json_type == "null":
+        if value == "" or (isinstance(value, str) and value.strip().lower() in ("null", "none")):
+            return None
+    return _FAILED
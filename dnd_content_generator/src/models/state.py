@@ -1,9 +1,17 @@
+def build_context_str(contexts, min_level, max_level):
+    """Context description shared by the GUI and the headless CLI."""
+    context_str = ", ".join(contexts)
+    context_str += f" for characters between level {min_level} and {max_level}"
+    return context_str
+
 class AppState:
     def __init__(self):
         self.selected_category = None
         self.selected_type = None
+        self.selected_types = []
         self.num_results = 3
         self.contexts = []
+        self.context_groups = []
         self.min_level = 1
         self.max_level = 3
         self.regenerate_name_only = False
@@ -0,0 +1,130 @@
+import bisect
+import re
+
+_WORD = re.compile(r"[^\W_]+")
+# Sorts after any word that starts with a given prefix
+_PREFIX_END = "\U0010ffff"
+
+
+class TaxonomyNode:
+    """One entry of a category or context file: a group (dict key) or a leaf (list value)."""
+
+    __slots__ = ("id", "end", "row", "text", "parent", "children", "depth", "leaf_count")
+
+    def __init__(self, node_id, text, parent, row):
+        self.id = node_id
+        # One past the last id below this node: its subtree is ids id..end-1
+        self.end = node_id + 1
+        # Position among its parent's children (or the top-level groups)
+        self.row = row
+        self.text = text
+        self.parent = parent
+        self.children = []
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.leaf_count = 1
+
+    @property
+    def is_leaf(self):
+        return not self.children
+
+    def path(self):
+        """Texts from the top-level group down to this node."""
+        parts = []
+        node = self
+        while node is not None:
+            parts.append(node.text)
+            node = node.parent
+        return parts[::-1]
+
+
+class Taxonomy:
+    """
+    A parsed category or context file: nested dicts whose innermost values are lists of leaf
+    names. Nodes are numbered in depth-first order, so `nodes[node.id] is node` and a node's
+    subtree is the contiguous slice `nodes[node.id:node.end]`.
+
+    Filtering goes through a word index built on the first match(): the lowercase words of
+    every node's text are kept sorted, so the nodes matching a prefix are found with a bisect
+    instead of a walk over the whole hierarchy.
+    """
+
+    def __init__(self, data):
+        self.nodes = []
+        self.roots = []
+        if isinstance(data, dict):
+            for key, value in data.items():
+                self.roots.append(self._add(key, value, None, len(self.roots)))
+        self._words = None
+        self._postings = None
+
+    def _add(self, text, value, parent, row):
+        node = TaxonomyNode(len(self.nodes), str(text), parent, row)
+        self.nodes.append(node)
+        if isinstance(value, dict):
+            for key, child in value.items():
+                node.children.append(self._add(key, child, node, len(node.children)))
+        elif isinstance(value, list):
+            for leaf in value:
+                node.children.append(self._add(leaf, None, node, len(node.children)))
+        if node.children:
+            node.leaf_count = sum(child.leaf_count for child in node.children)
+        node.end = len(self.nodes)
+        return node
+
+    def leaf_ids(self, node):
+        """Ids of the leaves at or below `node`, in tree order."""
+        return [n.id for n in self.nodes[node.id:node.end] if not n.children]
+
+    def _build_index(self):
+        postings = {}
+        for node in self.nodes:
+            for word in set(_WORD.findall(node.text.lower())):
+                postings.setdefault(word, []).append(node.id)
+        self._words = sorted(postings)
+        self._postings = [postings[word] for word in self._words]
+
+    def match(self, query):
+        """
+        Ids of the nodes whose text has, for every word of `query`, a word starting with it
+        ("dark hau" matches "Haunted Dark Forest"). None if the query has no words, i.e. no filter.
+        """
+        words = set(_WORD.findall(query.lower()))
+        if not words:
+            return None
+        if self._words is None:
+            self._build_index()
+        matches = None
+        # Longer prefixes match fewer words, so intersect starting from the smallest sets
+        for word in sorted(words, key=len, reverse=True):
+            start = bisect.bisect_left(self._words, word)
+            end = bisect.bisect_right(self._words, word + _PREFIX_END, start)
+            ids = set()
+            for postings in self._postings[start:end]:
+                ids.update(postings)
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                break
+        return matches
+
+    def with_ancestors(self, ids):
+        """`ids` plus the ids of every node above them."""
+        result = set(ids)
+        for node_id in ids:
+            parent = self.nodes[node_id].parent
+            while parent is not None and parent.id not in result:
+                result.add(parent.id)
+                parent = parent.parent
+        return result
+
+    def hidden_for(self, visible):
+        """
+        The fewest nodes to hide so that exactly `visible` (closed under ancestors) shows:
+        hiding a node hides everything below it, so only the topmost node of each hidden
+        branch is returned. Empty when `visible` is None.
+        """
+        if visible is None:
+            return set()
+        hidden = {root.id for root in self.roots if root.id not in visible}
+        for node_id in visible:
+            hidden.update(child.id for child in self.nodes[node_id].children if child.id not in visible)
+        return hidden
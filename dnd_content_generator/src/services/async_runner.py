@@ -0,0 +1,52 @@
+import asyncio
+import threading
+from src.services.logger import logger
+
+
+class AsyncRunner:
+    """
+    Owns one asyncio event loop running in a daemon thread for the lifetime of the app.
+
+    Coroutines are submitted from any thread and come back as concurrent.futures.Future
+    objects. Because the loop is never torn down between requests, per-loop resources such
+    as GPTService's connection pool and request scheduler stay warm.
+    """
+
+    def __init__(self, name="asyncio-runner"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule `coro` on the loop and return a concurrent.futures.Future for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Submit `coro` and block until it finishes. Must not be called from the loop thread."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self, cleanup=None, timeout=5):
+        """Cancel outstanding tasks, run the optional `cleanup` coroutine, then stop the loop."""
+        if self.loop.is_closed():
+            return
+        try:
+            self.run(self._shutdown(cleanup), timeout)
+        except Exception as e:
+            logger.error(f"Error while shutting down the async runner: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
+
+    async def _shutdown(self, cleanup):
+        current = asyncio.current_task()
+        tasks = [t for t in asyncio.all_tasks() if t is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if cleanup is not None:
+            await cleanup
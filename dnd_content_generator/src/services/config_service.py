@@ -0,0 +1,158 @@
+import os
+import threading
+from src.services.logger import logger
+from src.utils import load_config
+
+DEFAULT_CONFIG_PATH = "src/config/config.json"
+_MISSING = object()
+
+
+class Config:
+    """
+    Parsed config.json shared by every component in the process (see get_config).
+
+    Values are read from memory with get()/get_int()/get_float()/get_bool()/get_str(), which walk
+    nested keys and fall back to a default when a key is missing or has the wrong type.
+    reload_if_changed() re-reads the file only when its mtime or size changed and then calls the
+    subscribers of every section that differs, in the calling thread. A file that fails to parse
+    is reported and ignored, keeping the last good config.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH, data=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._stamp = None
+        self._data = data if data is not None else {}
+        if data is None:
+            self.reload()
+
+    @classmethod
+    def from_dict(cls, data):
+        """A fixed config that is never reloaded, e.g. for benchmarks."""
+        return cls(path=None, data=data)
+
+    @property
+    def data(self):
+        # Replaced wholesale on reload, never mutated, so handing it out is safe
+        return self._data
+
+    def get(self, *keys, default=None):
+        value = self._data
+        for key in keys:
+            if not isinstance(value, dict):
+                return default
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+        return value
+
+    def section(self, name):
+        value = self._data.get(name)
+        return value if isinstance(value, dict) else {}
+
+    def get_int(self, *keys, default=None):
+        return self._typed(keys, default, lambda v: int(v) if not isinstance(v, bool) else None)
+
+    def get_float(self, *keys, default=None):
+        return self._typed(keys, default, lambda v: float(v) if not isinstance(v, bool) else None)
+
+    def get_str(self, *keys, default=None):
+        return self._typed(keys, default, lambda v: v if isinstance(v, str) else None)
+
+    def get_bool(self, *keys, default=None):
+        def cast(value):
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+                return value.strip().lower() == "true"
+            return None
+        return self._typed(keys, default, cast)
+
+    def _typed(self, keys, default, cast):
+        value = self.get(*keys, default=_MISSING)
+        if value is _MISSING or value is None:
+            return default
+        try:
+            result = cast(value)
+        except (TypeError, ValueError):
+            result = None
+        if result is None:
+            logger.warning(f"Config value {'.'.join(keys)}={value!r} has the wrong type; using {default!r}.")
+            return default
+        return result
+
+    def subscribe(self, callback, sections=None):
+        """
+        Call `callback(config)` after a reload that changed any of `sections` (top-level keys),
+        or any section if None. Returns `callback`, for unsubscribe().
+        """
+        with self._lock:
+            self._subscribers.append((callback, set(sections) if sections else None))
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [(cb, sections) for cb, sections in self._subscribers if cb is not callback]
+
+    def reload_if_changed(self):
+        """Cheap enough to poll: a stat call unless the file changed. Returns True if a new config was applied."""
+        if self.path is None:
+            return False
+        try:
+            stamp = self._file_stamp()
+        except OSError:
+            return False
+        if stamp == self._stamp:
+            return False
+        return self.reload(stamp)
+
+    def reload(self, stamp=None):
+        with self._lock:
+            first_load = self._stamp is None
+            stamp = stamp or self._file_stamp()
+            try:
+                data = load_config(self.path)
+            except (OSError, ValueError) as e:
+                if first_load:
+                    raise
+                # Likely caught mid-save; the next change to the file is tried again
+                logger.error(f"Ignoring unreadable config {self.path}: {e}")
+                self._stamp = stamp
+                return False
+            old = self._data
+            self._data = data
+            self._stamp = stamp
+            subscribers = list(self._subscribers)
+
+        if first_load:
+            return True
+        changed = {key for key in set(old) | set(data) if old.get(key) != data.get(key)}
+        if not changed:
+            return False
+        logger.info(f"Reloaded {self.path}; changed: {', '.join(sorted(changed))}.")
+        for callback, sections in subscribers:
+            if sections is None or sections & changed:
+                try:
+                    callback(self)
+                except Exception as e:
+                    logger.error(f"Config subscriber {callback!r} failed: {e}")
+        return True
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+_configs = {}
+_configs_lock = threading.Lock()
+
+
+def get_config(path=DEFAULT_CONFIG_PATH):
+    """The process-wide Config for `path`, loaded on first use."""
+    key = os.path.abspath(path)
+    with _configs_lock:
+        config = _configs.get(key)
+        if config is None:
+            config = _configs[key] = Config(path)
+        return config
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import random
+import re
+from collections import deque
+from src.services.logger import logger
+
+MASK_64 = (1 << 64) - 1
+
+
+def shingles(text, k=5):
+    """Character k-grams of the lower-cased text with punctuation and runs of whitespace collapsed."""
+    normalized = " ".join(re.sub(r"[^\w]+", " ", text.lower()).split())
+    if len(normalized) <= k:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + k] for i in range(len(normalized) - k + 1)}
+
+
+class MinHasher:
+    """
+    MinHash signatures over shingle sets. Each of the `num_perm` hash functions is the shingle's
+    64-bit hash XORed with a fixed random mask; signatures only live in memory, so Python's
+    own string hash is good enough.
+    """
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+    def signature(self, shingle_set):
+        if not shingle_set:
+            return None
+        hashes = [hash(s) & MASK_64 for s in shingle_set]
+        return tuple(min(h ^ mask for h in hashes) for mask in self.masks)
+
+    @staticmethod
+    def similarity(a, b):
+        """Estimated Jaccard similarity of the two shingle sets behind signatures `a` and `b`."""
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class _Scope:
+    """Signatures, LSH buckets and recent names for one content type."""
+
+    def __init__(self, bands, name_history):
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+        self.names = {}
+        self.recent_names = deque(maxlen=name_history)
+        # Task loading stored results into the scope; every caller of prepare() waits for the same one
+        self.seeding = None
+
+
+class NearDuplicateFilter:
+    """
+    Flags items whose name + description are nearly identical to one already accepted for the
+    same content type, this session or (via `load_existing`) in the result store.
+
+    Candidates are found with MinHash + LSH banding and confirmed against `threshold`; an
+    identical normalized name always counts as a duplicate. Accepted names are kept so they
+    can be fed back into prompts.
+    """
+
+    def __init__(self, threshold=0.6, num_perm=64, bands=16, load_existing=None, seed_limit=2000,
+                 name_history=200):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm)
+        self.load_existing = load_existing
+        self.seed_limit = seed_limit
+        self.name_history = name_history
+        self._scopes = {}
+        self._next_id = 0
+
+        self.checked = 0
+        self.duplicates = 0
+        self.duplicate_tokens = 0
+
+    async def prepare(self, content_type):
+        """
+        Seed the scope for `content_type` from stored results, off the event loop, once. Callers
+        arriving while that is under way wait for it rather than checking against a partial scope.
+        """
+        if self.load_existing is None:
+            return
+        scope = self._scope(content_type)
+        # A seeding task cancelled with the loop that ran it never finished, so it starts over
+        if scope.seeding is None or scope.seeding.cancelled():
+            scope.seeding = asyncio.ensure_future(self._seed(scope, content_type))
+        elif not scope.seeding.done() and scope.seeding.get_loop() is not asyncio.get_running_loop():
+            logger.warning(f"Stored {content_type} results are still loading on another event loop; not waiting.")
+            return
+        # The shield keeps a cancelled caller from cancelling the seeding the others wait on
+        await asyncio.shield(scope.seeding)
+
+    async def _seed(self, scope, content_type):
+        try:
+            items = await asyncio.to_thread(self.load_existing, content_type, self.seed_limit)
+        except Exception as e:
+            logger.error(f"Could not load stored results for duplicate detection: {e}")
+            return
+        # Stored results come newest first; add oldest first so recent names stay most recent
+        for item in reversed(items):
+            self._add(scope, item, self._signature(item))
+        if items:
+            logger.info(f"Duplicate detection seeded with {len(items)} stored {content_type} item(s).")
+
+    def check(self, content_type, item):
+        """
+        Return the name of the existing item `item` duplicates, or None. Unique items are
+        recorded, so a later near-copy of them is caught too.
+        """
+        scope = self._scope(content_type)
+        self.checked += 1
+        signature = self._signature(item)
+        name_key = self._name_key(item)
+
+        duplicate_of = scope.names.get(name_key) if name_key else None
+        if duplicate_of is None and signature is not None:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(scope.buckets[band].get(key, ()))
+            for candidate in candidates:
+                other_signature, other_name = scope.signatures[candidate]
+                if MinHasher.similarity(signature, other_signature) >= self.threshold:
+                    duplicate_of = other_name
+                    break
+
+        if duplicate_of is not None:
+            self.duplicates += 1
+            self.duplicate_tokens += len(json.dumps(item, ensure_ascii=False)) // 4
+            return duplicate_of
+        self._add(scope, item, signature)
+        return None
+
+    def used_names(self, content_type, limit=30):
+        scope = self._scopes.get(self._scope_key(content_type))
+        if scope is None:
+            return []
+        return list(scope.recent_names)[-limit:]
+
+    def _add(self, scope, item, signature):
+        name = self._name(item)
+        name_key = self._name_key(item)
+        if name_key:
+            scope.names.setdefault(name_key, name)
+            scope.recent_names.append(name)
+        if signature is None:
+            return
+        item_id = self._next_id
+        self._next_id += 1
+        scope.signatures[item_id] = (signature, name)
+        for band, key in enumerate(self._band_keys(signature)):
+            scope.buckets[band].setdefault(key, []).append(item_id)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows] for band in range(self.bands)]
+
+    def _signature(self, item):
+        text = f"{self._name(item)} {item.get('Description', item.get('description', ''))}"
+        return self.hasher.signature(shingles(text))
+
+    def _name(self, item):
+        return str(item.get("Name", item.get("name", "")))
+
+    def _name_key(self, item):
+        return " ".join(re.sub(r"[^\w]+", " ", self._name(item).lower()).split())
+
+    def _scope_key(self, content_type):
+        return (content_type or "").lower().strip()
+
+    def _scope(self, content_type):
+        key = self._scope_key(content_type)
+        scope = self._scopes.get(key)
+        if scope is None:
+            scope = self._scopes[key] = _Scope(self.bands, self.name_history)
+        return scope
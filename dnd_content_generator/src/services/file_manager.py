@@ -2,18 +2,18 @@ import json
 import os
 import datetime
 import glob
-from src.services.logger import logger
-from src.utils import load_config
+import re
+from src.services.config_service import DEFAULT_CONFIG_PATH, get_config
 
 class FileManager:
-    def __init__(self, config_path="src/config/config.json"):
-        self.config = load_config(config_path)
-        self.log_directories = self.config["log-directories"]
-        self.schema_file = self.config["schema-validation"]["default_schema"]
+    def __init__(self, config_path=DEFAULT_CONFIG_PATH):
+        self.config = get_config(config_path)
+        self.log_directories = self.config.section("log-directories")
+        self.schema_file = self.config.get_str("schema-validation", "default_schema")
 
         # Initialize with defaults from config
-        self.categories_file = self.config["default_categories_file"]
-        self.contexts_file = self.config["default_contexts_file"]
+        self.categories_file = self.config.get_str("default_categories_file")
+        self.contexts_file = self.config.get_str("default_contexts_file")
 
     def set_categories_file(self, filename):
         """Set the categories file to a selected filename. Assumes file exists in src/resources."""
@@ -35,16 +35,14 @@ class FileManager:
         with open(self.schema_file, "r", encoding="utf-8") as f:
             return json.load(f)
 
-    def write_to_log_file(self, category, content, detailed=False):
+    def export_path(self, category, extension):
+        """Path for a new export file. Microsecond timestamps keep back-to-back exports apart."""
         directory = self.log_directories.get(category.lower(), "./logs/")
         os.makedirs(directory, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-        extension = ".json" if detailed else ".csv"
-        filename = f"{category.lower()}_{timestamp}{extension}"
-        path = os.path.join(directory, filename)
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-        logger.info(f"Exported {category} to {path}")
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        # Type names can hold path separators or run long; keep the file name safe and short
+        name = re.sub(r"[^\w-]+", "_", category.lower()).strip("_")[:64] or "results"
+        return os.path.join(directory, f"{name}_{timestamp}{extension}")
 
     def get_available_categories_files(self):
         """Return a list of available category JSON files found in src/resources."""
@@ -1,37 +1,330 @@
 # gpt_service.py
 import asyncio
+import contextlib
+import threading
+import weakref
+import httpx
 import openai
-import random
+from src.services.config_service import Config, get_config
+from src.services.llm_errors import RateLimitError, classify
 from src.services.logger import logger
-from src.utils import load_config
-
-async def post_to_gpt(messages, temp = 0.27):
-    config = load_config("src/config/config.json")
-    client = openai.AsyncOpenAI(api_key=config['gpt-api']['api-key'])
-
-    model_name = config["app-settings"]["models"][0]
-    conversation = [{"role": "user", "content": config.get("primer", "") + "\n\n" + messages}]
-    logger.info(f"temp: {temp}")
-    try:        
-        # Use the modern async call for chat completions        
-        response = await client.chat.completions.create(
-            model=model_name,
-            messages=conversation,
-            max_tokens=config["app-settings"].get("max-tokens", 7000),
-            temperature=temp,
-            top_p=0.9,
-            n=1
-        )
-        reply = response.choices[0].message.content
-        logger.info(f"""Prompt: {conversation} \n\nResponse: {reply}""")
-        return reply.strip()
-    except Exception as e:
-        logger.error(f"GPT request failed: {e}")
-        return None
+from src.services.request_scheduler import RequestScheduler, PRIORITY_BULK
+from src.services.response_cache import ResponseCache
+from src.services.retry_policy import CircuitBreaker, RetryPolicy
+
 
 class GPTService:
-    def __init__(self):
-        pass
+    def __init__(self, config=None):
+        # A plain dict (benchmarks) is used as is; otherwise follow the shared config and its reloads
+        if isinstance(config, dict):
+            self.config = Config.from_dict(config)
+        else:
+            self.config = config or get_config()
+
+        # Optional on-disk cache of replies for deterministic prompts (schemas, statblocks)
+        self.response_cache = None
+        if self.config.get_bool("response-cache", "enable", default=False):
+            self.response_cache = ResponseCache(
+                self.config.get_str("response-cache", "path", default="./cache/llm_responses.sqlite3"),
+                max_bytes=self.config.get_int("response-cache", "max-bytes", default=50 * 1024 * 1024),
+                ttl_seconds=self.config.get_float("response-cache", "ttl-seconds", default=7 * 24 * 3600),
+                temperature_step=self.config.get_float("response-cache", "temperature-step", default=0.1)
+            )
+
+        # Transient failures (429, timeouts, 5xx) are retried here with backoff; one breaker is shared
+        # by every request so a failing endpoint is not hammered by a whole batch
+        self.circuit_breaker = CircuitBreaker()
+
+        # httpx pools and asyncio primitives are bound to the event loop they were created on,
+        # so keep one client and scheduler per loop. Entries disappear once their loop is garbage collected.
+        # The lock is for config reloads, which look at these from another thread
+        self._lock = threading.Lock()
+        self._clients = weakref.WeakKeyDictionary()
+        self._schedulers = weakref.WeakKeyDictionary()
+        # Requests using each client, and replaced clients to close once their last request is done.
+        # Both are only touched on the client's own loop
+        self._client_users = {}
+        self._retired_clients = set()
+
+        self._apply_config(self.config)
+        self.config.subscribe(
+            self._on_config_changed, ("gpt-api", "app-settings", "primer", "rate-limits", "retry-policy")
+        )
+
+    def _apply_config(self, config):
+        self.api_key = config.get_str("gpt-api", "api-key")
+        self.base_url = config.get_str("gpt-api", "base-url")
+        self.model_name = config.get("app-settings", "models", default=["gpt-4o"])[0]
+        self.max_tokens = config.get_int("app-settings", "max-tokens", default=7000)
+        self.primer = config.get_str("primer", default="")
+
+        # Connection pool settings shared by every request made through this service
+        self.max_connections = config.get_int("app-settings", "max-connections", default=20)
+        self.max_keepalive_connections = config.get_int("app-settings", "max-keepalive-connections", default=10)
+        self.keepalive_expiry = config.get_float("app-settings", "keepalive-expiry", default=30.0)
+        self.request_timeout = config.get_float("app-settings", "request-timeout", default=120.0)
+
+        # Admission control for fan-out generation
+        self.max_concurrent_requests = config.get_int("rate-limits", "max-concurrent-requests", default=8)
+        self.requests_per_minute = config.get_int("rate-limits", "requests-per-minute")
+        self.tokens_per_minute = config.get_int("rate-limits", "tokens-per-minute")
+
+        self.retry_policy = RetryPolicy(
+            max_attempts=config.get_int("retry-policy", "max-attempts", default=4),
+            base_delay=config.get_float(
+                "retry-policy", "base-delay", default=config.get_float("app-settings", "llm_retry_delay", default=1.0)
+            ),
+            max_delay=config.get_float("retry-policy", "max-delay", default=60.0)
+        )
+        self.circuit_breaker.failure_threshold = config.get_int("retry-policy", "circuit-failure-threshold", default=5)
+        self.circuit_breaker.reset_timeout = config.get_float("retry-policy", "circuit-reset-seconds", default=30.0)
+
+    def _client_settings(self):
+        return (self.api_key, self.base_url, self.max_connections, self.max_keepalive_connections,
+                self.keepalive_expiry, self.request_timeout)
+
+    def _limits(self):
+        return self.max_concurrent_requests, self.requests_per_minute, self.tokens_per_minute
+
+    def _on_config_changed(self, config):
+        client_settings, limits = self._client_settings(), self._limits()
+        self._apply_config(config)
+        if self._client_settings() != client_settings:
+            # Clients carry the key, endpoint and pool limits. Each is replaced and closed on its own
+            # loop; requests already holding one finish on it
+            with self._lock:
+                clients = list(self._clients.items())
+            for loop, client in clients:
+                retire = self._retire_client(loop, client)
+                try:
+                    asyncio.run_coroutine_threadsafe(retire, loop)
+                except RuntimeError:
+                    # The loop has been closed
+                    retire.close()
+        if self._limits() == limits:
+            return
+        # Schedulers belong to their loops, so the new limits are applied there
+        with self._lock:
+            schedulers = list(self._schedulers.items())
+        for loop, scheduler in schedulers:
+            try:
+                loop.call_soon_threadsafe(scheduler.set_limits, *self._limits())
+            except RuntimeError:
+                # The loop has been closed
+                pass
+
+    async def _retire_client(self, loop, client):
+        with self._lock:
+            if self._clients.get(loop) is not client:
+                return
+            del self._clients[loop]
+        if self._client_users.get(client):
+            self._retired_clients.add(client)
+        else:
+            await client.close()
 
-    async def send_prompt_async(self, prompt, temp=0.27):
-        return await post_to_gpt(prompt, temp)
+    def _get_client(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=self.request_timeout
+            )
+            client = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                http_client=http_client,
+                # Retries are handled by retry_policy, which also knows about the circuit breaker
+                max_retries=0
+            )
+            with self._lock:
+                self._clients[loop] = client
+        return client
+
+    @contextlib.asynccontextmanager
+    async def _use_client(self):
+        """The running loop's client, kept open until the caller is done even if a config change replaces it."""
+        client = self._get_client()
+        self._client_users[client] = self._client_users.get(client, 0) + 1
+        try:
+            yield client
+        finally:
+            self._client_users[client] -= 1
+            if not self._client_users[client]:
+                del self._client_users[client]
+                if client in self._retired_clients:
+                    self._retired_clients.discard(client)
+                    await client.close()
+
+    def _get_scheduler(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            scheduler = self._schedulers.get(loop)
+            if scheduler is None:
+                scheduler = RequestScheduler(
+                    max_concurrent=self.max_concurrent_requests,
+                    requests_per_minute=self.requests_per_minute,
+                    tokens_per_minute=self.tokens_per_minute
+                )
+                self._schedulers[loop] = scheduler
+        return scheduler
+
+    def _estimate_tokens(self, text):
+        # Rough prompt size (~4 chars per token) plus the completion budget,
+        # which is what providers count against tokens-per-minute limits.
+        return len(text) // 4 + self.max_tokens
+
+    def _cache_key(self, content, temp):
+        return self.response_cache.make_key(self.model_name, content, temp, self.max_tokens)
+
+    async def discard_cached_async(self, prompt, temp=0.27):
+        """Forget a cached reply the caller rejected, so the next identical request goes to the LLM."""
+        if self.response_cache is not None:
+            await asyncio.to_thread(self.response_cache.discard, self._cache_key(self.primer + "\n\n" + prompt, temp))
+
+    async def aclose(self):
+        """Close the pooled client belonging to the running event loop, if any."""
+        with self._lock:
+            client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+    async def _backoff(self, error, attempt, scheduler):
+        """
+        Record `error` against the breaker and wait before the next attempt. Raises `error`
+        when it should not be retried.
+        """
+        if error.trips_breaker:
+            self.circuit_breaker.record_failure()
+        elif error.status is not None:
+            # The endpoint answered (429, 400...), so it is up as far as the breaker is concerned
+            self.circuit_breaker.record_success()
+        delay = self.retry_policy.delay(attempt, error)
+        if delay is None:
+            logger.error(f"GPT request failed ({error.__class__.__name__}): {error}")
+            raise error
+        logger.warning(
+            f"GPT request failed ({error.__class__.__name__}), retrying in {delay:.1f}s "
+            f"(attempt {attempt+1}/{self.retry_policy.max_attempts}): {error}"
+        )
+        if isinstance(error, RateLimitError) and error.retry_after is not None:
+            # The limit applies to every request, not just this one
+            scheduler.pause(error.retry_after)
+        await asyncio.sleep(delay)
+
+    async def send_prompt_async(self, prompt, temp=0.27, priority=PRIORITY_BULK, use_cache=True):
+        """
+        Return the stripped reply text ("" if the model returned no content). Transient failures
+        are retried with backoff; anything else, or running out of attempts, raises an LLMError.
+        """
+        conversation = [{"role": "user", "content": self.primer + "\n\n" + prompt}]
+        cache_key = None
+        if use_cache and self.response_cache is not None:
+            cache_key = self._cache_key(conversation[0]["content"], temp)
+            # SQLite calls run on a worker thread so they never stall the shared event loop
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Response cache hit (temp: {temp})")
+                return cached
+
+        async with self._use_client() as client:
+            scheduler = self._get_scheduler()
+            reserved_tokens = self._estimate_tokens(conversation[0]["content"])
+            logger.info(f"temp: {temp}")
+            for attempt in range(self.retry_policy.max_attempts):
+                self.circuit_breaker.before_request()
+                try:
+                    async with scheduler.slot(reserved_tokens, priority):
+                        # Use the modern async call for chat completions
+                        response = await client.chat.completions.create(
+                            model=self.model_name,
+                            messages=conversation,
+                            max_tokens=self.max_tokens,
+                            temperature=temp,
+                            top_p=0.9,
+                            n=1
+                        )
+                except Exception as e:
+                    await self._backoff(classify(e), attempt, scheduler)
+                    continue
+
+                self.circuit_breaker.record_success()
+                if response.usage is not None:
+                    scheduler.adjust_tokens(reserved_tokens, response.usage.total_tokens)
+                reply = response.choices[0].message.content or ""
+                logger.info(f"""Prompt: {conversation} \n\nResponse: {reply}""")
+                reply = reply.strip()
+                if cache_key is not None and reply:
+                    await asyncio.to_thread(self.response_cache.put, cache_key, reply)
+                return reply
+
+    async def stream_prompt_async(self, prompt, temp=0.27, priority=PRIORITY_BULK, use_cache=True):
+        """
+        Async generator yielding the reply text as it streams in. Closing the generator early
+        aborts the HTTP request and frees the scheduler slot.
+
+        Failures before the first chunk are retried like send_prompt_async and raise an LLMError
+        once retries are exhausted. A failure mid-stream is logged and ends the stream, leaving
+        the caller with a truncated reply.
+        """
+        conversation = [{"role": "user", "content": self.primer + "\n\n" + prompt}]
+        cache_key = None
+        if use_cache and self.response_cache is not None:
+            cache_key = self._cache_key(conversation[0]["content"], temp)
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                logger.info(f"Response cache hit (temp: {temp})")
+                yield cached
+                return
+
+        async with self._use_client() as client:
+            scheduler = self._get_scheduler()
+            reserved_tokens = self._estimate_tokens(conversation[0]["content"])
+            logger.info(f"temp: {temp} (streaming)")
+            parts = []
+            for attempt in range(self.retry_policy.max_attempts):
+                self.circuit_breaker.before_request()
+                try:
+                    async with scheduler.slot(reserved_tokens, priority):
+                        stream = await client.chat.completions.create(
+                            model=self.model_name,
+                            messages=conversation,
+                            max_tokens=self.max_tokens,
+                            temperature=temp,
+                            top_p=0.9,
+                            n=1,
+                            stream=True,
+                            stream_options={"include_usage": True}
+                        )
+                        try:
+                            async for chunk in stream:
+                                if chunk.usage is not None:
+                                    scheduler.adjust_tokens(reserved_tokens, chunk.usage.total_tokens)
+                                if chunk.choices and chunk.choices[0].delta.content:
+                                    parts.append(chunk.choices[0].delta.content)
+                                    yield chunk.choices[0].delta.content
+                        finally:
+                            await stream.close()
+                except Exception as e:
+                    error = classify(e)
+                    if not parts:
+                        await self._backoff(error, attempt, scheduler)
+                        continue
+                    # Text already went to the caller, so the request cannot be replayed transparently
+                    if error.trips_breaker:
+                        self.circuit_breaker.record_failure()
+                    logger.error(f"GPT streaming request failed mid-reply ({error.__class__.__name__}): {error}")
+                    return
+                self.circuit_breaker.record_success()
+                break
+
+        reply = "".join(parts).strip()
+        logger.info(f"""Prompt: {conversation} \n\nResponse: {reply}""")
+        if cache_key is not None and reply:
+            await asyncio.to_thread(self.response_cache.put, cache_key, reply)
@@ -0,0 +1,87 @@
+import asyncio
+import httpx
+import openai
+
+
+class LLMError(Exception):
+    """
+    A failed LLM request. `retryable` errors may succeed if the same request is sent again
+    later; `trips_breaker` errors count against the endpoint's circuit breaker.
+    """
+
+    retryable = False
+    trips_breaker = False
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        # Seconds the server asked us to wait before retrying, if it said so
+        self.retry_after = retry_after
+
+
+class RateLimitError(LLMError):
+    retryable = True
+
+
+class LLMTimeoutError(LLMError):
+    retryable = True
+    trips_breaker = True
+
+
+class LLMConnectionError(LLMError):
+    retryable = True
+    trips_breaker = True
+
+
+class ServerError(LLMError):
+    retryable = True
+    trips_breaker = True
+
+
+class AuthenticationError(LLMError):
+    # Every later request would fail the same way, so stop sending them
+    trips_breaker = True
+
+
+class BadRequestError(LLMError):
+    pass
+
+
+class CircuitOpenError(LLMError):
+    """Raised without contacting the endpoint while the circuit breaker is open."""
+
+
+def _retry_after(response):
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        # HTTP-date form; the backoff schedule applies instead
+        pass
+    return None
+
+
+def classify(error):
+    """Map an exception raised by the OpenAI client (or httpx underneath it) to an LLMError."""
+    if isinstance(error, LLMError):
+        return error
+    message = str(error) or error.__class__.__name__
+    if isinstance(error, openai.RateLimitError):
+        return RateLimitError(message, 429, _retry_after(error.response))
+    if isinstance(error, (openai.APITimeoutError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return LLMTimeoutError(message)
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return LLMConnectionError(message)
+    if isinstance(error, openai.APIStatusError):
+        status = error.status_code
+        if status >= 500 or status in (408, 409):
+            return ServerError(message, status, _retry_after(error.response))
+        if status in (401, 403):
+            return AuthenticationError(message, status)
+        return BadRequestError(message, status)
+    return LLMError(message)
@@ -52,3 +52,45 @@ Follow these rules:
 - Flatten data: no complex nested objects. 
 - The output must be strictly valid JSON with a single top-level object.
 """
+
+BATCH_PROMPT = """
+You are an RPG content generator for {system}, set in {setting}. You help lazy DMs generate rich and diverse content. 
+You will produce strictly valid JSON that describes {count} different examples of any of ({content_type}) influenced by {context} themes. 
+Ensure an appropriate name is chosen. Low level items should be generic in name, unimpressive and mundane. 
+Not all items are useful or positive in effect. Items can have costs or penaltys for use, particularly powerful items.
+
+Follow these rules:
+- Return only raw JSON, no markdown code fences or extra commentary.
+- The JSON must be valid per RFC 8259.
+- Return a JSON array containing exactly {count} objects. Each object must independently conform to the schema below.
+- The objects must be clearly distinct from each other: different names, concepts and descriptions.
+- Include a "name" field and a "description" field in every object. 
+- Name and description have the highest priority and should be listed first.
+- Flatten all properties. Avoid nested objects if possible. If you must use nested objects, flatten them into strings.
+- Each property in the JSON schema is assigned an integer "ui_order" field. 
+  "name" has ui_order=1, "description"=2, and then assign ui_order=3,4,... to other fields by priority of importance.
+- Sort each object's properties by ui_order. Every object must have fields in ascending ui_order order.
+- Integer values must be integers, strings in double-quotes, etc. No trailing commas.
+
+Your output:
+A single JSON array of {count} objects, strictly valid JSON, and no additional text.
+
+Schema:
+
+{schema}
+"""
+
+FIELD_REPAIR_PROMPT = """
+The JSON object below describes a {content_type}. It is correct except for the fields listed under "Fields to fix", which failed validation.
+
+Object:
+{data}
+
+Fields to fix (with their schema):
+{fields}
+
+Validation errors:
+{errors}
+
+Return only a raw JSON object containing the fields to fix with corrected values, nothing else. Do not repeat the other fields. No markdown code fences or extra commentary.
+"""
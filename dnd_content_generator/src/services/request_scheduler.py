@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+
+# Lower value is served first. Interactive requests (e.g. "More Info" statblocks)
+# jump ahead of anything queued by bulk generation.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate_per_minute`.
+    The balance may go negative when actual usage exceeds a reservation;
+    later requests then wait for the debt to be repaid.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount):
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= amount
+
+    def refund(self, amount):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RequestScheduler:
+    """
+    Admits LLM requests under a concurrency cap and optional requests-per-minute /
+    tokens-per-minute budgets. Waiters are served strictly by (priority, arrival).
+
+    A scheduler belongs to one event loop; GPTService keeps one per loop.
+    """
+
+    def __init__(self, max_concurrent=8, requests_per_minute=None, tokens_per_minute=None):
+        self.max_concurrent = max_concurrent
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._waiters = []
+        self._counter = itertools.count()
+        self._active = 0
+        self._timer = None
+        self._paused_until = 0.0
+
+    async def acquire(self, tokens=0, priority=PRIORITY_BULK):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted a slot but cancelled before we could use it: hand it back
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                self._dispatch()
+            raise
+
+    def release(self):
+        self._active -= 1
+        self._dispatch()
+
+    def adjust_tokens(self, reserved, actual):
+        """Correct a token reservation once the real usage of a request is known."""
+        if self._token_bucket is None or actual is None:
+            return
+        if actual < reserved:
+            self._token_bucket.refund(reserved - actual)
+        elif actual > reserved:
+            self._token_bucket.consume(actual - reserved)
+
+    def set_limits(self, max_concurrent, requests_per_minute=None, tokens_per_minute=None):
+        """Apply new limits (e.g. after a config reload). Requests already admitted are not affected."""
+        self.max_concurrent = max_concurrent
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._dispatch()
+
+    def pause(self, seconds):
+        """Admit nothing new for `seconds`, e.g. after the provider answered 429 with Retry-After."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tokens=0, priority=PRIORITY_BULK):
+        await self.acquire(tokens, priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters and self._active < self.max_concurrent:
+            priority, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+
+            delay = max(0.0, self._paused_until - time.monotonic())
+            if self._request_bucket is not None:
+                delay = max(delay, self._request_bucket.delay_for(1))
+            if self._token_bucket is not None:
+                delay = max(delay, self._token_bucket.delay_for(tokens))
+            if delay > 0:
+                # Head of line waits for the buckets; wake up when it can be served
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._waiters)
+            if self._request_bucket is not None:
+                self._request_bucket.consume(1)
+            if self._token_bucket is not None:
+                self._token_bucket.consume(tokens)
+            self._active += 1
+            future.set_result(None)
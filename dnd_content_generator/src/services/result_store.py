@@ -0,0 +1,316 @@
+import csv
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from src.services.logger import logger
+
+
+class ResultStore:
+    """
+    Durable store of every generated item.
+
+    Items are appended as JSON lines to numbered segment files and indexed in SQLite by
+    run, name, type, context, level range, schema hash and timestamp; the index points at
+    each record's byte range in its segment. Writes are made durable in batches: the
+    segment is fsynced and the index committed every `sync_every` items or `sync_interval`
+    seconds, and whenever flush() is called. Records that reached the segment but not the
+    index before a crash are re-indexed on the next start.
+
+    Names and descriptions are also indexed for full-text search (SQLite FTS5); on SQLite
+    builds without FTS5, search falls back to substring matching on the name.
+    """
+
+    SEGMENT_PATTERN = "results-{:06d}.jsonl"
+
+    def __init__(self, directory, segment_max_bytes=64 * 1024 * 1024, sync_every=50, sync_interval=1.0):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT,
+                name TEXT,
+                category TEXT,
+                content_type TEXT,
+                context TEXT,
+                min_level INTEGER,
+                max_level INTEGER,
+                schema_hash TEXT,
+                created_at REAL NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+        """)
+        for column in ("run_id", "name", "content_type", "context", "schema_hash", "created_at"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_results_{column} ON results({column})")
+        self._conn.commit()
+        self.fts_enabled = self._create_fts()
+
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._segment_file = None
+        self._segment_name = None
+        self._open_segment(self._latest_segment_number() or 1)
+        self._recover()
+
+    def append(self, item, content_type="", context="", min_level=None, max_level=None, category="",
+               schema_hash=None, run_id=None):
+        """Append one item and return its id. It becomes durable with the next batch sync."""
+        record = {
+            "run": run_id,
+            "category": category,
+            "type": content_type,
+            "context": context,
+            "min_level": min_level,
+            "max_level": max_level,
+            "schema_hash": schema_hash,
+            "created_at": time.time(),
+            "item": item
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._segment_file.tell() + len(line) > self.segment_max_bytes and self._segment_file.tell() > 0:
+                self.flush()
+                self._open_segment(self._segment_number(self._segment_name) + 1)
+            offset = self._segment_file.tell()
+            self._segment_file.write(line)
+            row_id = self._index(record, self._segment_name, offset, len(line))
+            self._pending += 1
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self.flush()
+            return row_id
+
+    def flush(self):
+        """Make every appended item durable: fsync the segment, then commit the index."""
+        with self._lock:
+            if self._pending == 0:
+                return
+            self._segment_file.flush()
+            os.fsync(self._segment_file.fileno())
+            self._conn.commit()
+            self._pending = 0
+            self._last_sync = time.monotonic()
+
+    def search(self, text="", content_type=None, context=None, level=None, limit=50, offset=0):
+        """One page of stored items, newest first; see search_records(). Returns (items, has_more)."""
+        records, has_more = self.search_records(text, content_type, context, level, limit, offset)
+        return [record["item"] for record in records], has_more
+
+    def search_records(self, text="", content_type=None, context=None, level=None, limit=50, offset=0):
+        """
+        One page of stored records (the item with its type, contexts and levels), newest first. `text` is matched as word prefixes against
+        name and description; `context` is a substring of the job's contexts; `level` must
+        fall inside the item's level range. Returns (records, has_more).
+        """
+        clauses, params = [], []
+        terms = "".join(c if c.isalnum() else " " for c in text).split()
+        if terms and self.fts_enabled:
+            clauses.append("id IN (SELECT rowid FROM results_fts WHERE results_fts MATCH ?)")
+            params.append(" ".join(f'"{term}"*' for term in terms))
+        elif terms:
+            clauses.extend("name LIKE ?" for _ in terms)
+            params.extend(f"%{term}%" for term in terms)
+        if content_type:
+            clauses.append("content_type = ?")
+            params.append(content_type)
+        if context:
+            clauses.append("context LIKE ?")
+            params.append(f"%{context}%")
+        if level is not None:
+            clauses.append("min_level <= ? AND max_level >= ?")
+            params.extend([level, level])
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        # One row past the page tells whether there is a next page without counting every match
+        with self._lock:
+            self._segment_file.flush()
+            rows = self._conn.execute(
+                f"SELECT segment, offset, length FROM results{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + [limit + 1, offset]
+            ).fetchall()
+        return list(self._read_records(rows[:limit])), len(rows) > limit
+
+    def content_types(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT content_type FROM results WHERE content_type != '' ORDER BY content_type"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM results{where}", params).fetchone()[0]
+
+    def iter_items(self, **filters):
+        """Yield stored items matching `filters` in insertion order, reading segments sequentially."""
+        self.flush()
+        where, params = self._where(**filters)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT segment, offset, length FROM results{where} ORDER BY segment, offset", params
+            ).fetchall()
+        for record in self._read_records(rows):
+            yield record["item"]
+
+    def export_jsonl(self, path, **filters):
+        """Write matching items to `path` as JSON lines in one pass. Returns the number written."""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for item in self.iter_items(**filters):
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def export_csv(self, path, **filters):
+        """
+        Write matching items to `path` as CSV. Columns are the union of the items' keys in
+        first-seen order, so a first pass collects them and a second streams the rows.
+        """
+        fieldnames = {}
+        for item in self.iter_items(**filters):
+            for key in item:
+                fieldnames.setdefault(key, None)
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(fieldnames), restval="")
+            writer.writeheader()
+            for item in self.iter_items(**filters):
+                writer.writerow({k: v if isinstance(v, str) else json.dumps(v, ensure_ascii=False) for k, v in item.items()})
+                count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._segment_file.close()
+            self._conn.close()
+
+    def _where(self, run_id=None, content_type=None, context=None, name=None):
+        clauses, params = [], []
+        for column, value in (("run_id", run_id), ("content_type", content_type), ("context", context)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if name:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name}%")
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _index(self, record, segment, offset, length):
+        item = record["item"]
+        name = item.get("Name", item.get("name", "")) if isinstance(item, dict) else ""
+        cursor = self._conn.execute(
+            "INSERT INTO results (run_id, name, category, content_type, context, min_level, max_level, "
+            "schema_hash, created_at, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                record.get("run"), str(name), record.get("category"), record.get("type"), record.get("context"),
+                record.get("min_level"), record.get("max_level"), record.get("schema_hash"),
+                record.get("created_at", time.time()), segment, offset, length
+            )
+        )
+        if self.fts_enabled:
+            description = item.get("Description", item.get("description", "")) if isinstance(item, dict) else ""
+            self._conn.execute(
+                "INSERT INTO results_fts (rowid, name, description) VALUES (?, ?, ?)",
+                (cursor.lastrowid, str(name), str(description))
+            )
+        return cursor.lastrowid
+
+    def _create_fts(self):
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'results_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            # Contentless: the text already lives in the segments, the index only needs rowids
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE results_fts USING fts5(name, description, content='', tokenize='unicode61')"
+            )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite FTS5 unavailable, result search falls back to name matching: {e}")
+            return False
+        rows = self._conn.execute("SELECT id, segment, offset, length FROM results ORDER BY id").fetchall()
+        if rows:
+            logger.info(f"Building the search index for {len(rows)} stored result(s).")
+            records = self._read_records([row[1:] for row in rows])
+            for (row_id, *_), record in zip(rows, records):
+                item = record["item"] if isinstance(record["item"], dict) else {}
+                self._conn.execute(
+                    "INSERT INTO results_fts (rowid, name, description) VALUES (?, ?, ?)",
+                    (row_id, str(item.get("Name", item.get("name", ""))),
+                     str(item.get("Description", item.get("description", ""))))
+                )
+        self._conn.commit()
+        return True
+
+    def _read_records(self, rows):
+        handles = {}
+        try:
+            for segment, offset, length in rows:
+                f = handles.get(segment)
+                if f is None:
+                    f = handles[segment] = open(os.path.join(self.directory, segment), "rb")
+                f.seek(offset)
+                yield json.loads(f.read(length))
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def _segment_number(self, name):
+        return int(name.split("-")[1].split(".")[0])
+
+    def _latest_segment_number(self):
+        names = glob.glob(os.path.join(self.directory, "results-*.jsonl"))
+        return max((self._segment_number(os.path.basename(n)) for n in names), default=0)
+
+    def _open_segment(self, number):
+        if self._segment_file is not None:
+            self._segment_file.close()
+        self._segment_name = self.SEGMENT_PATTERN.format(number)
+        self._segment_file = open(os.path.join(self.directory, self._segment_name), "ab")
+
+    def _recover(self):
+        # Only the newest segment can hold records the index never saw: segments are
+        # flushed before a new one is started
+        end = self._conn.execute(
+            "SELECT COALESCE(MAX(offset + length), 0) FROM results WHERE segment = ?", (self._segment_name,)
+        ).fetchone()[0]
+        path = os.path.join(self.directory, self._segment_name)
+        size = os.path.getsize(path)
+        if end >= size:
+            return
+        recovered = 0
+        offset = end
+        with open(path, "rb") as f:
+            f.seek(end)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._index(record, self._segment_name, offset, len(line))
+                offset += len(line)
+                recovered += 1
+        self._conn.commit()
+        if offset < size:
+            logger.warning(f"Truncating incomplete record at the end of {path}.")
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+            # Reopen so appends continue from the truncated end
+            self._open_segment(self._segment_number(self._segment_name))
+        if recovered:
+            logger.info(f"Re-indexed {recovered} result(s) written before an unclean shutdown.")
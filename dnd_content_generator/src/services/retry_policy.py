@@ -0,0 +1,91 @@
+import random
+import threading
+import time
+from src.services.llm_errors import CircuitOpenError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter: attempt n waits a random time in
+    [0, min(max_delay, base_delay * multiplier**n)], so requests that failed together do not
+    retry together. A Retry-After from the server replaces the backoff; one longer than
+    `max_delay` is not worth waiting for.
+    """
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, multiplier=2.0, rng=None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self._random = rng or random.Random()
+
+    def delay(self, attempt, error):
+        """Seconds to wait before retrying after `error` on attempt `attempt` (0-based), or None to give up."""
+        if not error.retryable or attempt + 1 >= self.max_attempts:
+            return None
+        if error.retry_after is not None:
+            if error.retry_after > self.max_delay:
+                return None
+            # A little jitter on top keeps everyone told "retry in 2s" from arriving at once
+            return error.retry_after + self._random.uniform(0, self.base_delay)
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed requests and then rejects requests
+    with CircuitOpenError for `reset_timeout` seconds. After that a single probe request is
+    let through: success closes the circuit, failure opens it again.
+
+    Time-based and lock-protected, so one breaker can be shared by every event loop using
+    the same endpoint.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = None
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                wait = self.opened_at + self.reset_timeout - now
+                if wait <= 0:
+                    self.state = HALF_OPEN
+                    self.probe_started = now
+                    return
+            elif self.probe_started is None or now - self.probe_started > self.reset_timeout:
+                # The previous probe never reported back (e.g. it was cancelled)
+                self.probe_started = now
+                return
+            else:
+                wait = self.reset_timeout
+            self.rejected += 1
+        raise CircuitOpenError(f"Circuit open after {self.failures} consecutive failures", retry_after=wait)
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self.probe_started = None
@@ -1,29 +1,62 @@
 import asyncio
+import hashlib
 import json
 import os
 import random
 import time
+from collections import OrderedDict
 from jsonschema import Draft7Validator, ValidationError
 from functools import lru_cache
 from src.models.content_parser import ContentParser
 from src.services.file_manager import FileManager
 from src.services.gpt_service import GPTService
+from src.services.llm_errors import LLMError
 from src.services.logger import logger
 from src.services.prompt_templates import SCHEMA_PROMPT
-from src.utils import load_config
+from src.services.request_scheduler import PRIORITY_INTERACTIVE
+from src.services.schema_store import SchemaStore
+
+
+def schema_hash(schema):
+    """Stable content hash of a schema, independent of key order."""
+    canonical = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
 
 
 class SchemaService:
-    def __init__(self):
-        self.config = load_config("src/config/config.json")
-        self.gpt_service = GPTService()
+    def __init__(self, gpt_service=None):
+        self.gpt_service = gpt_service or GPTService()
+        self.config = self.gpt_service.config
         self.parser = ContentParser()
-        self.retry_count = self.config["app-settings"].get("llm_retry_count", 3)
-        self.retry_delay = self.config["app-settings"].get("llm_retry_delay", 2)
-        self.schema_enabled = self.config["schema-validation"].get("enable", False)
         self.schema_prompt_template = FileManager().load_default_schema()
-        self.default_schema_path = self.config["schema-validation"].get("default_schema", "")
+        self.schema_fetches = 0
+        self.coalesced_fetches = 0
+        self._apply_config(self.config)
+        self.config.subscribe(self._apply_config, ("app-settings", "schema-validation"))
+        self._schema_store_path = self.config.get_str("schema-validation", "cache_file", default="./cache/schemas.json")
+        self._apply_setting(self.config)
+        self.config.subscribe(self._apply_setting, ("default_system", "default_setting"))
+
+    def _apply_config(self, config):
+        self.retry_count = config.get_int("app-settings", "llm_retry_count", default=3)
+        self.schema_enabled = config.get_bool("schema-validation", "enable", default=False)
+        self.schema_temperature = config.get_float("schema-validation", "temperature", default=0.4)
+        self.default_schema_path = config.get_str("schema-validation", "default_schema", default="")
+        self.validator_cache_size = config.get_int("schema-validation", "validator_cache_size", default=64)
+
+    def _apply_setting(self, config):
+        # Schemas are generated for a system and setting, so a change starts a fresh store (whose
+        # fingerprint no longer matches the file) and drops what was cached for the old ones.
+        # Everything is replaced rather than cleared, as this runs on the thread that reloaded the config
+        self.system = config.get_str("default_system", default="D&D 3.5e")
+        self.setting = config.get_str("default_setting", default="a generic fantasy setting")
+        self._schema_store = SchemaStore(
+            self._schema_store_path,
+            SchemaStore.make_fingerprint(SCHEMA_PROMPT, self.schema_prompt_template, self.system, self.setting)
+        )
         self._schema_cache = {}
+        self._inflight = {}
+        self._validators = OrderedDict()
 
     async def get_schema(self, content_type, context_str):
         if not self.schema_enabled:
@@ -33,29 +66,69 @@ class SchemaService:
         if key in self._schema_cache:
             return self._schema_cache[key]
 
-        schema = await self._fetch_schema_from_llm(content_type, context_str)
-
-        if not schema:
+        schema = self._schema_store.get(key)
+        if schema is not None:
+            self._schema_cache[key] = schema
+            return schema
+
+        # Single-flight: concurrent callers for the same key share one fetch. The shield keeps a
+        # cancelled caller from cancelling the fetch the other waiters depend on.
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            self.coalesced_fetches += 1
+            logger.info(f"Coalesced schema request for {key} ({self.coalesced_fetches} coalesced so far).")
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._resolve_schema(key, content_type, context_str))
+        self._inflight[key] = task
+
+        def clear_inflight(done_task):
+            if self._inflight.get(key) is done_task:
+                del self._inflight[key]
+
+        task.add_done_callback(clear_inflight)
+        self.schema_fetches += 1
+        return await asyncio.shield(task)
+
+    async def _resolve_schema(self, key, content_type, context_str):
+        store, cache = self._schema_store, self._schema_cache
+        schema = await self._fetch_schema_from_llm(content_type, context_str, self.system, self.setting)
+
+        if schema:
+            # _fetch_schema_from_llm only returns validated schemas. Only those are persisted;
+            # fallbacks are retried on the next launch. A fetch that outlived a system/setting
+            # change is not saved over the new store's file
+            if store is self._schema_store:
+                store.put(key, schema)
+        else:
             logger.warning("Falling back to default schema due to LLM failures.")
             schema = self._load_default_schema()
 
-        # Validate that schema is valid JSON schema and meets our ui_order requirements
-        if not self._is_valid_schema(schema):
-            logger.warning("Fetched schema is not valid or does not meet ui_order requirements. Falling back to default schema.")
-            schema = await self._load_default_schema()
-
-        self._schema_cache[key] = schema
+        cache[key] = schema
         return schema
 
     def validate_data(self, schema, data):
+        self.get_validator(schema).validate(data)
+
+    def get_validator(self, schema):
+        """
+        Return a compiled validator for `schema`, building it on first use.
+        The meta-schema check runs once, when the schema enters the LRU cache.
+        """
+        key = schema_hash(schema)
+        validator = self._validators.get(key)
+        if validator is not None:
+            self._validators.move_to_end(key)
+            return validator
+
         Draft7Validator.check_schema(schema)
         validator = Draft7Validator(schema)
-        validator.validate(data)
-
-    async def _fetch_schema_from_llm(self, content_type, context_str):
-        system = self.config.get("default_system", "D&D 3.5e")
-        setting = self.config.get("default_setting", "a generic fantasy setting")
+        self._validators[key] = validator
+        if len(self._validators) > self.validator_cache_size:
+            self._validators.popitem(last=False)
+        return validator
 
+    async def _fetch_schema_from_llm(self, content_type, context_str, system, setting):
         prompt = SCHEMA_PROMPT.format(
             system=system,
             setting=setting,
@@ -65,19 +138,30 @@ class SchemaService:
         )
         for attempt in range(self.retry_count):
             try:
-                temp = random.uniform(0.1, 0.7)
-                response = await self.gpt_service.send_prompt_async(prompt, temp)
+                # The first attempt uses a fixed temperature so identical prompts can be served from
+                # the response cache; retries sample fresh at a random temperature.
+                first_attempt = attempt == 0
+                temp = self.schema_temperature if first_attempt else random.uniform(0.1, 0.7)
+                # Every item of a batch waits on the schema, so it goes ahead of bulk requests
+                response = await self.gpt_service.send_prompt_async(
+                    prompt, temp, priority=PRIORITY_INTERACTIVE, use_cache=first_attempt
+                )
                 if response:
                     schema = self.parser.parse_json(response)
                     if schema and self._is_valid_schema(schema):
                         return schema
                     else:
                         logger.error(f"Received schema is invalid or doesn't meet requirements. Attempt {attempt+1}/{self.retry_count}")
+                        if first_attempt:
+                            await self.gpt_service.discard_cached_async(prompt, temp)
                 else:
-                    logger.error(f"No response from LLM for schema generation. Attempt {attempt+1}/{self.retry_count}")
+                    logger.error(f"Empty reply from LLM for schema generation. Attempt {attempt+1}/{self.retry_count}")
+            except LLMError as e:
+                # Transient failures were already retried by GPTService
+                logger.error(f"Error fetching schema from LLM: {e}")
+                return None
             except Exception as e:
                 logger.error(f"Error fetching schema from LLM: {e}. Attempt {attempt+1}/{self.retry_count}")
-            await asyncio.sleep(self.retry_delay)
         return None
 
     def _is_valid_schema(self, schema):
@@ -144,7 +228,7 @@ class SchemaService:
                     "description": {"type": "string", "ui_order": 2}
                 },
                 "required": ["name", "description"],
-                "additionalProperties": false
+                "additionalProperties": False
             }
         with open(self.default_schema_path, "r", encoding="utf-8") as f:
             schema = json.load(f)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+from src.services.logger import logger
+
+
+class SchemaStore:
+    """
+    On-disk store of validated schemas keyed by (content_type, context).
+
+    The file records a format version and a fingerprint of everything that shapes a
+    schema (prompt template, default schema, system/setting). If either differs from
+    the running code the stored schemas are ignored and overwritten on the next save.
+    The file is read lazily on first lookup.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self._schemas = None
+
+    @staticmethod
+    def make_fingerprint(*parts):
+        digest = hashlib.sha256()
+        for part in parts:
+            if not isinstance(part, str):
+                part = json.dumps(part, sort_keys=True, ensure_ascii=False)
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        self._ensure_loaded()
+        return self._schemas.get(key)
+
+    def put(self, key, schema):
+        self._ensure_loaded()
+        self._schemas[key] = schema
+        self._save()
+
+    def _ensure_loaded(self):
+        if self._schemas is not None:
+            return
+        self._schemas = {}
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable schema store {self.path}: {e}")
+            return
+        if data.get("version") != self.VERSION or data.get("fingerprint") != self.fingerprint:
+            logger.info("Schema store is stale (prompt or default schema changed); schemas will be refetched.")
+            return
+        for entry in data.get("schemas", []):
+            self._schemas[(entry["content_type"], entry["context"])] = entry["schema"]
+        logger.info(f"Loaded {len(self._schemas)} cached schemas from {self.path}")
+
+    def _save(self):
+        data = {
+            "version": self.VERSION,
+            "fingerprint": self.fingerprint,
+            "schemas": [
+                {"content_type": content_type, "context": context, "schema": schema}
+                for (content_type, context), schema in self._schemas.items()
+            ]
+        }
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write then rename so a crash never leaves a half-written store behind
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Failed to save schema store {self.path}: {e}")
@@ -7,6 +7,25 @@ def show_error(parent, message):
     msg.setWindowTitle("Error")
     msg.exec()
 
+def ask_resume(parent, completed, total):
+    """Ask whether to resume an unfinished run. Returns True to resume, False to start over, None to cancel."""
+    msg = QMessageBox(parent)
+    msg.setIcon(QMessageBox.Question)
+    msg.setText(f"A previous run of this selection stopped after {completed} of {total} item(s).")
+    msg.setInformativeText("Resume it, or start over and generate everything again?")
+    msg.setWindowTitle("Resume")
+    resume = msg.addButton("Resume", QMessageBox.AcceptRole)
+    restart = msg.addButton("Start Over", QMessageBox.DestructiveRole)
+    msg.addButton(QMessageBox.Cancel)
+    msg.setDefaultButton(resume)
+    msg.exec()
+    clicked = msg.clickedButton()
+    if clicked is resume:
+        return True
+    if clicked is restart:
+        return False
+    return None
+
 def show_info(parent, message):
     msg = QMessageBox(parent)
     msg.setIcon(QMessageBox.Information)
@@ -0,0 +1,122 @@
+from PySide6.QtWidgets import QWidget, QHBoxLayout, QLineEdit, QComboBox, QSpinBox, QPushButton, QLabel
+from PySide6.QtCore import QTimer
+
+
+class HistoryPanel(QWidget):
+    """
+    Search bar over previously generated content:
+    - Full-text search on name/description
+    - Filters on type, context and level
+    - Prev/Next paging; each page is handed to `on_results` for display
+    """
+
+    def __init__(self, search, on_results, page_size=50, parent=None):
+        super().__init__(parent)
+        self.search = search
+        self.on_results = on_results
+        self.page_size = page_size
+        self.page = 0
+        self.has_more = False
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0,0,0,0)
+        layout.setSpacing(5)
+
+        self.text_edit = QLineEdit()
+        self.text_edit.setPlaceholderText("Search previous results...")
+        self.text_edit.returnPressed.connect(self.run_search)
+
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("All types")
+        self.type_combo.currentIndexChanged.connect(self.schedule_search)
+
+        self.context_edit = QLineEdit()
+        self.context_edit.setPlaceholderText("Context")
+        self.context_edit.returnPressed.connect(self.run_search)
+
+        self.level_spin = QSpinBox()
+        self.level_spin.setRange(0, 20)
+        self.level_spin.setSpecialValueText("Any level")
+        self.level_spin.valueChanged.connect(self.schedule_search)
+
+        self.search_btn = QPushButton("Search")
+        self.search_btn.clicked.connect(self.run_search)
+        self.prev_btn = QPushButton("< Prev")
+        self.prev_btn.clicked.connect(self.previous_page)
+        self.next_btn = QPushButton("Next >")
+        self.next_btn.clicked.connect(self.next_page)
+        self.page_label = QLabel("")
+
+        layout.addWidget(QLabel("History:"))
+        layout.addWidget(self.text_edit, 2)
+        layout.addWidget(self.type_combo, 1)
+        layout.addWidget(self.context_edit, 1)
+        layout.addWidget(self.level_spin)
+        layout.addWidget(self.search_btn)
+        layout.addWidget(self.prev_btn)
+        layout.addWidget(self.next_btn)
+        layout.addWidget(self.page_label)
+        self.setLayout(layout)
+
+        # Typing searches once the user pauses rather than on every keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.run_search)
+        self.text_edit.textChanged.connect(self.schedule_search)
+        self.context_edit.textChanged.connect(self.schedule_search)
+
+        self._update_paging()
+
+    def set_content_types(self, content_types):
+        current = self.type_combo.currentText()
+        self.type_combo.blockSignals(True)
+        self.type_combo.clear()
+        self.type_combo.addItem("All types")
+        self.type_combo.addItems(content_types)
+        index = self.type_combo.findText(current)
+        self.type_combo.setCurrentIndex(max(index, 0))
+        self.type_combo.blockSignals(False)
+
+    def schedule_search(self):
+        self.search_timer.start()
+
+    def run_search(self):
+        self.page = 0
+        self._load_page()
+
+    def previous_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self._load_page()
+
+    def next_page(self):
+        if self.has_more:
+            self.page += 1
+            self._load_page()
+
+    def _load_page(self):
+        self.search_timer.stop()
+        content_type = self.type_combo.currentText() if self.type_combo.currentIndex() > 0 else None
+        level = self.level_spin.value() or None
+        results, self.has_more = self.search(
+            self.text_edit.text(),
+            content_type,
+            self.context_edit.text().strip() or None,
+            level,
+            self.page_size,
+            self.page * self.page_size
+        )
+        self._update_paging(len(results))
+        self.on_results(results)
+
+    def _update_paging(self, count=None):
+        self.prev_btn.setEnabled(self.page > 0)
+        self.next_btn.setEnabled(self.has_more)
+        if count is None:
+            self.page_label.setText("")
+        elif count == 0:
+            self.page_label.setText("No matches")
+        else:
+            first = self.page * self.page_size + 1
+            self.page_label.setText(f"{first}-{first + count - 1}")
@@ -3,26 +3,27 @@ import glob
 import json
 
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QLabel, QTreeWidget,
-    QTreeWidgetItem, QPushButton, QSplitter, QTextEdit, QFrame, QProgressDialog,
-    QComboBox, QDialog, QScrollArea
+    QMainWindow, QWidget, QHBoxLayout, QVBoxLayout, QLineEdit, QLabel, QTreeView,
+    QPushButton, QSplitter, QTextEdit, QFrame, QProgressDialog,
+    QComboBox, QDialog, QScrollArea, QAbstractItemView
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QColor, QBrush
+from PySide6.QtCore import Qt, QTimer
 
-from src.ui.dialogs import show_error, show_info
-from src.utils import load_config
+from src.ui.dialogs import ask_resume, show_error, show_info
 from src.services.logger import logger
 from src.ui.results_view import ResultsView
+from src.ui.history_panel import HistoryPanel
 from src.ui.options_panel import OptionsPanel
+from src.ui.taxonomy_model import TaxonomyModel
+from src.models.taxonomy import Taxonomy
 
 
 class MainWindow(QMainWindow):
     def __init__(self, app_controller, parent=None):
         super().__init__(parent)
         self.app_controller = app_controller
-        self.config = load_config("src/config/config.json")
-        self.ui_config = self.config.get("ui", {})
+        self.config = app_controller.config
+        self.ui_config = self.config.section("ui")
         self.setWindowTitle("D&D Content Generator")
 
         main_splitter = QSplitter(Qt.Horizontal, self)
@@ -95,7 +96,9 @@ class MainWindow(QMainWindow):
         # Category Filter + Tree
         self.category_filter = QLineEdit()
         self.category_filter.setPlaceholderText("Filter categories...")
-        self.category_filter.textChanged.connect(self.filter_categories)
+        # Filter once typing pauses rather than on every keystroke
+        self.category_filter_timer = self._single_shot_timer(self.filter_categories, 150)
+        self.category_filter.textChanged.connect(lambda _: self.category_filter_timer.start())
         left_layout.addWidget(self.category_filter)
 
         # Controls for Category Tree
@@ -117,10 +120,9 @@ class MainWindow(QMainWindow):
         cat_controls_layout.addWidget(self.cat_select_siblings_btn)
         left_layout.addLayout(cat_controls_layout)
 
-        self.category_tree = QTreeWidget()
-        self.category_tree.setHeaderLabel("Categories & Types")
-        self.category_tree.setSelectionMode(QTreeWidget.SingleSelection)
-        self.category_tree.itemChanged.connect(self.on_item_changed)
+        self.category_model = TaxonomyModel("Categories & Types", "Select a Category...", self)
+        self.category_model.checked_changed.connect(self.on_category_type_selected)
+        self.category_tree = self._taxonomy_view(self.category_model, QAbstractItemView.SingleSelection)
         left_layout.addWidget(self.category_tree, 1)  # Stretch factor to give tree more space
 
         # Context Breadcrumb Section
@@ -159,7 +161,8 @@ class MainWindow(QMainWindow):
         # Context Filter + Tree
         self.context_filter = QLineEdit()
         self.context_filter.setPlaceholderText("Filter contexts...")
-        self.context_filter.textChanged.connect(self.filter_contexts)
+        self.context_filter_timer = self._single_shot_timer(self.filter_contexts, 150)
+        self.context_filter.textChanged.connect(lambda _: self.context_filter_timer.start())
         left_layout.addWidget(self.context_filter)
 
         ctx_controls_layout = QHBoxLayout()
@@ -180,10 +183,9 @@ class MainWindow(QMainWindow):
         ctx_controls_layout.addWidget(self.ctx_select_siblings_btn)
         left_layout.addLayout(ctx_controls_layout)
 
-        self.context_tree = QTreeWidget()
-        self.context_tree.setHeaderLabel("Contexts")
-        self.context_tree.setSelectionMode(QTreeWidget.MultiSelection)
-        self.context_tree.itemChanged.connect(self.on_item_changed)
+        self.context_model = TaxonomyModel("Contexts", "Select a Context...", self)
+        self.context_model.checked_changed.connect(self.on_context_selected)
+        self.context_tree = self._taxonomy_view(self.context_model, QAbstractItemView.MultiSelection)
         left_layout.addWidget(self.context_tree, 2)  # More space for contexts as well
 
         # --- Right side: Options, Campaign Notes, Preview, Results ---
@@ -255,8 +257,13 @@ class MainWindow(QMainWindow):
         results_layout.setContentsMargins(5,5,5,5)
         results_layout.setSpacing(5)
 
+        self.history_panel = HistoryPanel(self.app_controller.search_results, self.show_history_results)
+        self.history_panel.set_content_types(self.app_controller.stored_content_types())
+        results_layout.addWidget(self.history_panel)
+
         self.results_view = ResultsView()
-        self.results_view.table.itemSelectionChanged.connect(self.update_preview)
+        self.results_view.selection_changed.connect(self.update_preview)
+        self.results_view.selection_changed.connect(self.schedule_statblock_prefetch)
         self.results_view.setMinimumHeight(300)
         results_layout.addWidget(self.results_view)
 
@@ -271,20 +278,57 @@ class MainWindow(QMainWindow):
         main_splitter.setSizes([int(self.width() * 0.15), int(self.width() * 0.85)])
         self.setCentralWidget(main_splitter)
 
+        # Once the selection settles, fetch its schema in the background so Generate starts sooner
+        self.schema_prefetch_timer = QTimer(self)
+        self.schema_prefetch_timer.setSingleShot(True)
+        self.schema_prefetch_timer.setInterval(1500)
+        self.schema_prefetch_timer.timeout.connect(self.app_controller.prefetch_schema)
+
+        # Statblocks are generated in the background; a row that stays selected is expanded
+        # speculatively so "More Info" can open straight from the cache
+        self.pending_statblock_key = None
+        self.app_controller.statblock_notifier.ready.connect(self.on_statblock_ready)
+        self.statblock_prefetch_timer = QTimer(self)
+        self.statblock_prefetch_timer.setSingleShot(True)
+        self.statblock_prefetch_timer.timeout.connect(self.prefetch_selected_statblock)
+
+        # Edits to config.json are picked up while the app runs; components subscribe to the sections they use
+        self._apply_config(self.config)
+        self.config.subscribe(self._apply_config, ("app-settings", "statblock-prefetch"))
+        self.config_reload_timer = QTimer(self)
+        self.config_reload_timer.setInterval(self.config.get_int("app-settings", "config-reload-ms", default=2000))
+        self.config_reload_timer.timeout.connect(self.config.reload_if_changed)
+        self.config_reload_timer.start()
+
         self._show_category_placeholder()
         self._show_context_placeholder()
 
+    def _apply_config(self, config):
+        self.schema_prefetch_enabled = config.get_bool("app-settings", "schema-prefetch", default=False)
+        # AppController subscribed first, so its values are already current
+        self.statblock_prefetch_timer.setInterval(self.app_controller.statblock_prefetch_delay)
+
+    def _single_shot_timer(self, callback, interval):
+        timer = QTimer(self)
+        timer.setSingleShot(True)
+        timer.setInterval(interval)
+        timer.timeout.connect(callback)
+        return timer
+
+    def _taxonomy_view(self, model, selection_mode):
+        tree = QTreeView()
+        tree.setModel(model)
+        tree.setSelectionMode(selection_mode)
+        tree.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Every row is one line of text, so Qt can lay out rows without measuring them
+        tree.setUniformRowHeights(True)
+        return tree
+
     def _show_category_placeholder(self):
-        self.category_tree.clear()
-        placeholder_item = QTreeWidgetItem(["Select a Category..."])
-        placeholder_item.setFlags(placeholder_item.flags() & ~Qt.ItemIsUserCheckable)
-        self.category_tree.addTopLevelItem(placeholder_item)
+        self.category_model.set_taxonomy(None)
 
     def _show_context_placeholder(self):
-        self.context_tree.clear()
-        placeholder_item = QTreeWidgetItem(["Select a Context..."])
-        placeholder_item.setFlags(placeholder_item.flags() & ~Qt.ItemIsUserCheckable)
-        self.context_tree.addTopLevelItem(placeholder_item)
+        self.context_model.set_taxonomy(None)
 
     def on_category_file_changed(self, filename):
         if filename.startswith("Select"):
@@ -309,105 +353,23 @@ class MainWindow(QMainWindow):
         self.on_context_selected()  # Refresh breadcrumb
 
     def _populate_category_tree(self):
-        self.category_tree.clear()
         categories = self.app_controller.categories
         if not categories:
-            placeholder_item = QTreeWidgetItem(["Select a Category..."])
-            placeholder_item.setFlags(placeholder_item.flags() & ~Qt.ItemIsUserCheckable)
-            self.category_tree.addTopLevelItem(placeholder_item)
+            self._show_category_placeholder()
             return
-
-        for top_key, top_value in categories.items():
-            top_item = QTreeWidgetItem([top_key])
-            self.category_tree.addTopLevelItem(top_item)
-            self._add_items(top_item, top_value)
-        self.apply_color_coding(self.category_tree)
-        self._finalize_tree_checkstates(self.category_tree)
+        self.category_model.set_taxonomy(Taxonomy(categories))
+        self.filter_categories()
 
     def _populate_context_tree(self):
-        self.context_tree.clear()
         contexts = self.app_controller.contexts
         if not contexts:
-            placeholder_item = QTreeWidgetItem(["Select a Context..."])
-            placeholder_item.setFlags(placeholder_item.flags() & ~Qt.ItemIsUserCheckable)
-            self.context_tree.addTopLevelItem(placeholder_item)
-            return
-
-        for top_key, top_value in contexts.items():
-            top_item = QTreeWidgetItem([top_key])
-            self.context_tree.addTopLevelItem(top_item)
-            self._add_context_items(top_item, top_value)
-        self.apply_color_coding(self.context_tree)
-        self._finalize_tree_checkstates(self.context_tree)
-
-    def _add_items(self, parent_item, data):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                node = QTreeWidgetItem([key])
-                parent_item.addChild(node)
-                self._add_items(node, value)
-        elif isinstance(data, list):
-            for val in data:
-                leaf = QTreeWidgetItem([val])
-                parent_item.addChild(leaf)
-
-    def _add_context_items(self, parent_item, data):
-        if isinstance(data, dict):
-            for key, value in data.items():
-                node = QTreeWidgetItem([key])
-                parent_item.addChild(node)
-                self._add_context_items(node, value)
-        elif isinstance(data, list):
-            for val in data:
-                leaf = QTreeWidgetItem([val])
-                parent_item.addChild(leaf)
-
-    def _finalize_tree_checkstates(self, tree):
-        def finalize_item(item):
-            if item.childCount() > 0:
-                item.setFlags(item.flags() | Qt.ItemIsUserCheckable | Qt.ItemIsTristate)
-                item.setCheckState(0, Qt.Unchecked)
-                for i in range(item.childCount()):
-                    finalize_item(item.child(i))
-            else:
-                flags = item.flags() | Qt.ItemIsUserCheckable
-                item.setFlags(flags & ~Qt.ItemIsTristate)
-                item.setCheckState(0, Qt.Unchecked)
-
-        for i in range(tree.topLevelItemCount()):
-            top_item = tree.topLevelItem(i)
-            finalize_item(top_item)
-
-    def on_item_changed(self, item, column):
-        if column != 0:
+            self._show_context_placeholder()
             return
-        self.propagate_check_state_to_children(item, item.checkState(0))
-        # After changing checks, update categories and contexts accordingly
-        self.on_category_type_selected()
-        self.on_context_selected()
-
-    def propagate_check_state_to_children(self, item, state):
-        for i in range(item.childCount()):
-            child = item.child(i)
-            child.setCheckState(0, state)
-            self.propagate_check_state_to_children(child, state)
-
-    def get_checked_leaves(self, tree):
-        """Return a list of all checked leaf node texts from the given QTreeWidget."""
-        checked_items = []
-        def recurse(node):
-            if node.childCount() == 0 and node.checkState(0) == Qt.Checked:
-                checked_items.append(node.text(0))
-            for i in range(node.childCount()):
-                recurse(node.child(i))
-        for i in range(tree.topLevelItemCount()):
-            top = tree.topLevelItem(i)
-            recurse(top)
-        return checked_items
+        self.context_model.set_taxonomy(Taxonomy(contexts))
+        self.filter_contexts()
 
     def on_category_type_selected(self):
-        # Gather all checked leaves from category tree
-        checked_categories = self.get_checked_leaves(self.category_tree)
+        checked_categories = self.category_model.checked_leaves()
         if checked_categories:
             lines = self._group_siblings(self.category_tree, checked_categories)
             breadcrumb_text = " | ".join(lines)
@@ -415,60 +377,39 @@ class MainWindow(QMainWindow):
         else:
             self.app_controller.set_category(None)
             self.app_controller.set_type(None)
+            self.app_controller.set_types([])
             self.update_category_breadcrumb("")
+        self.schedule_schema_prefetch()
 
     def on_context_selected(self):
-        # Gather all checked leaves from context tree
-        checked_contexts = self.get_checked_leaves(self.context_tree)
+        checked_contexts = self.context_model.checked_leaves()
         if checked_contexts:
             lines = self._group_siblings(self.context_tree, checked_contexts)
             breadcrumb_text = " | ".join(lines)
             self.update_context_breadcrumb(breadcrumb_text)
         else:
             self.app_controller.set_contexts([])
+            self.app_controller.set_context_groups([])
             self.update_context_breadcrumb("")
+        self.schedule_schema_prefetch()
+
+    def schedule_schema_prefetch(self):
+        if self.schema_prefetch_enabled:
+            # Restarting the timer debounces bursts of check-state changes
+            self.schema_prefetch_timer.start()
 
     def _group_siblings(self, tree, checked_leaves):
         """
-        Given a tree and a list of checked leaves, group siblings by their parent.
+        Given a tree and its checked leaf nodes, group siblings by their parent.
         Returns a list of strings like "Parent: child1, child2" or single-level items.
         Also updates the app_controller accordingly.
         """
-        def find_parents(item):
-            parts = []
-            current = item
-            while current is not None:
-                parts.insert(0, current.text(0))
-                current = current.parent()
-            return parts
-
-        def find_item_by_text(root_item, text):
-            if root_item.text(0) == text and root_item.childCount() == 0:
-                return root_item
-            for idx in range(root_item.childCount()):
-                found = find_item_by_text(root_item.child(idx), text)
-                if found:
-                    return found
-            return None
-
         parent_map = {}
-        root = tree.invisibleRootItem()
-
-        for leaf_text in checked_leaves:
-            found_item = None
-            for i in range(root.childCount()):
-                top_item = root.child(i)
-                found_item = find_item_by_text(top_item, leaf_text)
-                if found_item:
-                    break
-            if found_item:
-                path = find_parents(found_item)
-                if len(path) > 1:
-                    parent = path[-2]
-                    child = path[-1]
-                    parent_map.setdefault(parent, []).append(child)
-                else:
-                    parent_map.setdefault(path[-1], [])
+        for leaf in checked_leaves:
+            if leaf.parent is not None:
+                parent_map.setdefault(leaf.parent.text, []).append(leaf.text)
+            else:
+                parent_map.setdefault(leaf.text, [])
 
         lines = []
         categories_used = set()
@@ -490,118 +431,73 @@ class MainWindow(QMainWindow):
         if tree == self.category_tree:
             self.app_controller.set_category(", ".join(categories_used) if categories_used else None)
             self.app_controller.set_type(", ".join(types_used) if types_used else None)
+            self.app_controller.set_types([
+                (parent, child) for parent, children in parent_map.items() for child in children
+            ])
         else:
             self.app_controller.set_contexts(contexts_used)
+            self.app_controller.set_context_groups([children or [parent] for parent, children in parent_map.items()])
 
         return lines
 
     def filter_categories(self):
-        filter_text = self.category_filter.text().strip().lower()
-        if not filter_text:
-            self._set_tree_items_visible(self.category_tree, True)
-        else:
-            self._filter_tree(self.category_tree, filter_text)
+        self._filter_tree(self.category_tree, self.category_filter.text())
 
     def filter_contexts(self):
-        filter_text = self.context_filter.text().strip().lower()
-        if not filter_text:
-            self._set_tree_items_visible(self.context_tree, True)
-        else:
-            self._filter_tree(self.context_tree, filter_text)
+        self._filter_tree(self.context_tree, self.context_filter.text())
 
     def _filter_tree(self, tree, text):
-        for i in range(tree.topLevelItemCount()):
-            top_item = tree.topLevelItem(i)
-            self._filter_item(top_item, text)
-
-    def _filter_item(self, item, text):
-        match = text in item.text(0).lower()
-        child_match = False
-        for i in range(item.childCount()):
-            child = item.child(i)
-            if self._filter_item(child, text):
-                child_match = True
-        item.setHidden(not (match or child_match))
-        return match or child_match
-
-    def _set_tree_items_visible(self, tree, visible):
-        for i in range(tree.topLevelItemCount()):
-            top_item = tree.topLevelItem(i)
-            self._set_item_visible(top_item, visible)
-
-    def _set_item_visible(self, item, visible):
-        item.setHidden(not visible)
-        for i in range(item.childCount()):
-            self._set_item_visible(item.child(i), visible)
+        """
+        Show the nodes matching `text` and their ancestors. Matches come from the taxonomy's word
+        index and only rows whose hidden state differs from the previous filter are touched.
+        """
+        model = tree.model()
+        taxonomy = model.taxonomy
+        if taxonomy is None:
+            return
+        matches = taxonomy.match(text)
+        hidden = taxonomy.hidden_for(None if matches is None else taxonomy.with_ancestors(matches))
+        if hidden == model.hidden:
+            return
+        tree.setUpdatesEnabled(False)
+        try:
+            for node_id in model.hidden - hidden:
+                node = taxonomy.nodes[node_id]
+                tree.setRowHidden(node.row, model.index_for(node.parent), False)
+            for node_id in hidden - model.hidden:
+                node = taxonomy.nodes[node_id]
+                tree.setRowHidden(node.row, model.index_for(node.parent), True)
+        finally:
+            tree.setUpdatesEnabled(True)
+        model.hidden = hidden
 
     def set_all_expanded(self, tree, expand):
-        def recurse_expand(item):
-            item.setExpanded(expand)
-            for i in range(item.childCount()):
-                child = item.child(i)
-                recurse_expand(child)
-
-        for i in range(tree.topLevelItemCount()):
-            top = tree.topLevelItem(i)
-            recurse_expand(top)
+        if expand:
+            tree.expandAll()
+        else:
+            tree.collapseAll()
 
     def set_all_checked(self, tree, state):
-        for i in range(tree.topLevelItemCount()):
-            top = tree.topLevelItem(i)
-            top.setCheckState(0, state)
-            self.propagate_check_state_to_children(top, state)
+        model = tree.model()
+        if model.taxonomy is not None:
+            model.set_checked(model.taxonomy.roots, state == Qt.Checked)
 
     def select_siblings(self, tree):
-        selected_items = tree.selectedItems()
-        if not selected_items:
+        selected = tree.selectionModel().selectedIndexes()
+        if not selected:
             return
-        item = selected_items[0]
-        parent = item.parent()
-        if parent is not None:
-            for i in range(parent.childCount()):
-                sibling = parent.child(i)
-                sibling.setCheckState(0, Qt.Checked)
-                self.propagate_check_state_to_children(sibling, Qt.Checked)
-        else:
-            root = tree.invisibleRootItem()
-            for i in range(root.childCount()):
-                sibling = root.child(i)
-                sibling.setCheckState(0, Qt.Checked)
-                self.propagate_check_state_to_children(sibling, Qt.Checked)
-
-    def apply_color_coding(self, tree):
-        palette = [
-            "#7BD3EA",
-            "#A1EEBD",
-            "#F6D6D6",
-            "#F6F7C4",
-            "#999B84",
-            "#FFF6E3",
-            "#F9C0AB",
-            "#C1D8C3",
-            "#E4C59E",
-        ]
-
-        def color_item(item, depth, parent_color=None):
-            for offset in range(len(palette)):
-                color_str = palette[(depth + offset) % len(palette)]
-                if color_str != parent_color:
-                    brush = QBrush(QColor(color_str))
-                    item.setBackground(0, brush)
-                    break
-            for i in range(item.childCount()):
-                child = item.child(i)
-                current_color = item.background(0).color().name()
-                color_item(child, depth + 1, current_color)
-
-        for i in range(tree.topLevelItemCount()):
-            top_item = tree.topLevelItem(i)
-            color_item(top_item, 0, None)
+        model = tree.model()
+        node = model.node(selected[0])
+        if node is None:
+            return
+        siblings = node.parent.children if node.parent is not None else model.taxonomy.roots
+        model.set_checked(siblings, True)
 
     def on_options_changed(self, opts):
         self.app_controller.set_num_results(opts["num_results"])
         self.app_controller.set_detail_display_mode(opts["detail_display_mode"])
         self.app_controller.set_level_range(opts["min_level"], opts["max_level"])
+        self.schedule_schema_prefetch()
 
     def on_campaign_text_changed(self):
         text = self.campaign_prompt_edit.toPlainText()
@@ -614,49 +510,149 @@ class MainWindow(QMainWindow):
         self.app_controller.set_setting(text)
 
     def generate_content(self):
-        self.progress_dialog = QProgressDialog("Generating content...", "Cancel", 0, 0, self)
+        # An unfinished run of the same selection can be picked up where it stopped
+        resume = True
+        saved = self.app_controller.resumable_queue() if self.app_controller.state.selected_types else None
+        if saved is not None:
+            resume = ask_resume(self, saved.completed, saved.total)
+            if resume is None:
+                return
+
+        n_results = self.app_controller.state.num_results
+        self.progress_dialog = QProgressDialog("Generating content...", "Cancel", 0, n_results, self)
         self.progress_dialog.setWindowModality(Qt.WindowModal)
         self.progress_dialog.setAutoClose(False)
         self.progress_dialog.setAutoReset(False)
+        self.progress_dialog.setValue(0)
+        self.progress_dialog.canceled.connect(self.cancel_generation)
         self.progress_dialog.show()
 
-        def on_finished(results):
-            self.progress_dialog.close()
-            self.app_controller.state.last_results = results
-            self.results_view.display_results(results)
-            if results:
-                show_info(self, "Content generated successfully!")
-            else:
-                show_info(self, "No results generated.")
+        # Rows are appended as each item validates rather than when the whole batch is done;
+        # last_results catches up once, when the run finishes or fails
+        self.app_controller.state.last_results = []
+        self.results_view.display_results([])
+
+        future = self.app_controller.generate_content_async(
+            self.on_generation_finished,
+            self.on_generation_error,
+            on_result=self.on_generation_result,
+            on_partial=self.on_generation_partial,
+            resume=resume
+        )
+        if future is not None:
+            worker = self.app_controller.worker
+            self.progress_dialog.setMaximum(max(worker.target, 1))
+            if worker.already_completed:
+                self.progress_dialog.setLabelText(
+                    f"Resuming previous run: {worker.already_completed} of {worker.queue.total} already generated..."
+                )
+
+    def on_generation_result(self, result, content_type, context_str):
+        self.results_view.append_result(result, (content_type, context_str))
+        count = len(self.results_view.results)
+        self.progress_dialog.setValue(min(count, self.progress_dialog.maximum()))
+        self.progress_dialog.setLabelText(f"Generated {count} of {self.progress_dialog.maximum()}...")
+
+    def on_generation_partial(self, partial):
+        # Show the item currently being written, unless the user is looking at a finished row
+        if self.results_view.current_result() is not None:
+            return
+        name_value = partial.get("name", "")
+        description_value = partial.get("description", "")
+        self.preview_box.setHtml(
+            f"<small><i>Generating...</i></small><br />"
+            f"<strong>Name:</strong> {name_value}<br />"
+            f"Description:<br /><br /><i>{description_value}</i>"
+        )
+
+    def cancel_generation(self):
+        self.app_controller.cancel_generation()
+
+    def _close_progress_dialog(self):
+        # QProgressDialog emits canceled() when closed, which must not count as a user cancel
+        self.progress_dialog.canceled.disconnect(self.cancel_generation)
+        self.progress_dialog.close()
+
+    def on_generation_finished(self, results):
+        self._close_progress_dialog()
+        self.history_panel.set_content_types(self.app_controller.stored_content_types())
+        self.update_preview()
+        self.app_controller.state.last_results = list(self.results_view.results)
+        top_k = self.app_controller.statblock_prefetch_top_k
+        if top_k > 0:
+            self.app_controller.prefetch_statblocks(
+                self.results_view.results[:top_k], self.results_view.origins[:top_k]
+            )
+        if self.app_controller.worker.cancelled:
+            show_info(self, f"Generation cancelled. Kept {len(self.results_view.results)} completed result(s).")
+        elif results:
+            show_info(self, "Content generated successfully!")
+        else:
+            show_info(self, "No results generated.")
 
-        def on_error(message):
-            self.progress_dialog.close()
-            show_error(self, message)
+    def on_generation_error(self, message):
+        self._close_progress_dialog()
+        self.app_controller.state.last_results = list(self.results_view.results)
+        show_error(self, message)
 
-        self.app_controller.generate_content_async(on_finished, on_error)
+    def show_history_results(self, results):
+        # Each stored item comes with the type and contexts it was generated under, for "More Info"
+        items = [item for item, _ in results]
+        self.results_view.display_results(items, [origin for _, origin in results])
+        self.app_controller.state.last_results = items
+        self.update_preview()
 
     def export_detailed(self):
-        self.app_controller.export_to_logs(detailed=True)
-        show_info(self, "Detailed content exported successfully!")
+        path, count = self.app_controller.export_to_logs(detailed=True)
+        if not count:
+            show_error(self, "No results to export.")
+            return
+        show_info(self, f"Exported {count} detailed result(s) to {path}")
 
     def export_results_triggered(self):
-        self.app_controller.export_to_logs(detailed=False)
-        show_info(self, "Table exported successfully!")
+        path, count = self.app_controller.export_to_logs(detailed=False)
+        if not count:
+            show_error(self, "No results to export.")
+            return
+        show_info(self, f"Exported a table of {count} result(s) to {path}")
 
     def more_info_triggered(self):
-        row = self.results_view.table.currentRow()
-        if row < 0 or row >= len(self.results_view.results):
+        content = self.results_view.current_result()
+        if content is None:
             show_error(self, "No item selected for detailed info.")
             return
-        content = self.results_view.results[row]
-        self.show_full_statblock(content)
+        origin = self.results_view.current_origin()
+        key = self.app_controller.statblock_key(content, origin)
+        statblock = self.app_controller.cached_statblock(key)
+        if statblock:
+            self.pending_statblock_key = None
+            self.show_full_statblock(statblock)
+            return
+        self.pending_statblock_key = key
+        self.statusBar().showMessage("Generating detailed statblock...")
+        self.app_controller.request_statblock(content, origin)
 
-    def show_full_statblock(self, base_content):
-        statblock = self.app_controller.get_full_statblock(base_content)
+    def on_statblock_ready(self, key, statblock):
+        # Prefetched statblocks land in the controller's cache; only the one the user asked for opens
+        if key != self.pending_statblock_key:
+            return
+        self.pending_statblock_key = None
+        self.statusBar().clearMessage()
         if not statblock:
             show_error(self, "Failed to retrieve full statblock.")
             return
+        self.show_full_statblock(statblock)
+
+    def schedule_statblock_prefetch(self):
+        if self.app_controller.statblock_prefetch_selected:
+            self.statblock_prefetch_timer.start()
+
+    def prefetch_selected_statblock(self):
+        result = self.results_view.current_result()
+        if result is not None:
+            self.app_controller.prefetch_statblocks([result], [self.results_view.current_origin()])
 
+    def show_full_statblock(self, statblock):
         dlg = QDialog(self)
         dlg.setWindowTitle("Detailed Statblock")
         dlg.resize(300, 600)
@@ -707,11 +703,10 @@ class MainWindow(QMainWindow):
         dlg.exec()
 
     def update_preview(self):
-        row = self.results_view.table.currentRow()
-        if row < 0 or row >= len(self.results_view.results):
+        result = self.results_view.current_result()
+        if result is None:
             self.preview_box.clear()
             return
-        result = self.results_view.results[row]
         keys = list(result.keys())
         preview_text = ""
         if keys:
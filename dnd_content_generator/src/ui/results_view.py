@@ -1,48 +1,174 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableView, QLineEdit, QAbstractItemView
 from PySide6.QtWidgets import QHeaderView
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
 
 from src.services.logger import logger
 
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Table model over generated results. Each row is stored once as a tuple of display strings
+    in column order (plus the original dict for callers, and the origin it was generated
+    under, if known); cells are only produced when the view asks for the rows it is painting.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = []
+        self.items = []
+        self.origins = []
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section] if section < len(self.headers) else None
+        return str(section + 1)
+
+    def set_results(self, headers, items, origins=None):
+        self.beginResetModel()
+        self.headers = list(headers)
+        self.items = list(items)
+        self.origins = list(origins) if origins is not None else [None] * len(self.items)
+        self._rows = [self._row(item) for item in self.items]
+        self.endResetModel()
+
+    def append_results(self, items, origins=None):
+        if not items:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(items) - 1)
+        self.items.extend(items)
+        self.origins.extend(origins if origins is not None else [None] * len(items))
+        self._rows.extend(self._row(item) for item in items)
+        self.endInsertRows()
+
+    def row_texts(self, row):
+        return self._rows[row]
+
+    def _row(self, item):
+        return tuple(str(item.get(key, "")) for key in self.headers)
+
+
 class ResultsView(QWidget):
     """
     ResultsView displays generated results in a table only.
     The 'Export Table' and 'More Info' buttons were moved to the OptionsPanel.
+
+    Rows can be sorted by clicking a header and narrowed with the filter box; `current_result()`
+    maps the selected row back to its result whatever the sort order. Each row can carry the
+    origin it was generated under, a (content_type, context_str) pair; see `current_origin()`.
     """
 
     request_more_info = Signal(dict)
+    selection_changed = Signal()
+
+    # Column widths are measured on a sample of rows and kept within these bounds
+    SIZING_SAMPLE_ROWS = 50
+    MIN_COLUMN_WIDTH = 60
+    MAX_COLUMN_WIDTH = 320
+    MAX_DESCRIPTION_WIDTH = 520
 
     def __init__(self, parent=None):
         super().__init__(parent)
         layout = QVBoxLayout()
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(0)
-        self.table.setRowCount(0)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.SingleSelection)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filter results...")
+        self.filter_edit.setClearButtonEnabled(True)
 
+        self.model = ResultsTableModel(self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.proxy.setFilterKeyColumn(-1)
+        self.proxy.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.filter_edit.textChanged.connect(self.proxy.setFilterFixedString)
+
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSortingEnabled(True)
+        # Keep generation order until the user clicks a header
+        self.table.sortByColumn(-1, Qt.AscendingOrder)
+        self.table.setWordWrap(False)
+        self.table.setTextElideMode(Qt.ElideRight)
+        # Fixed row heights and interactive columns: Qt never has to measure every cell
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.selectionModel().selectionChanged.connect(self.selection_changed)
+
+        layout.addWidget(self.filter_edit)
         layout.addWidget(self.table)
         self.setLayout(layout)
 
-        self.results = []
         self.last_headers = []
+        self._sized_rows = 0
 
-    def display_results(self, results):
-        self.results = results
-        self.table.clear()
-        if not results:
-            if self.last_headers:
-                self.table.setColumnCount(len(self.last_headers))
-                self.table.setHorizontalHeaderLabels(self.last_headers)
-            else:
-                self.table.setColumnCount(0)
-            self.table.setRowCount(0)
-            return
+    @property
+    def results(self):
+        """All results in the order they were added, regardless of sorting and filtering."""
+        return self.model.items
+
+    @property
+    def origins(self):
+        """The origin of each result in `results`, None where unknown."""
+        return self.model.origins
 
+    def display_results(self, results, origins=None):
+        results = list(results)
+        if results:
+            self._set_headers(self._headers_for(results[0]))
+        self.model.set_results(self.last_headers, results, origins)
+        self._sized_rows = 0
+        self._size_columns()
+
+    def append_result(self, result, origin=None):
+        """Append a single result as a new row, setting up the columns on the first one."""
+        if not self.model.items:
+            self._set_headers(self._headers_for(result))
+            self.model.set_results(self.last_headers, [])
+            self._sized_rows = 0
+        self.model.append_results([result], [origin])
+        if self._sized_rows < self.SIZING_SAMPLE_ROWS:
+            self._size_columns()
+
+    def current_result(self):
+        """The selected result, or None if no row is selected."""
+        row = self._current_row()
+        return self.model.items[row] if row is not None else None
+
+    def current_origin(self):
+        """The (content_type, context_str) the selected result was generated under, or None."""
+        row = self._current_row()
+        return self.model.origins[row] if row is not None else None
+
+    def _current_row(self):
+        index = self.table.currentIndex()
+        if not index.isValid():
+            return None
+        row = self.proxy.mapToSource(index).row()
+        return row if 0 <= row < len(self.model.items) else None
+
+    def _headers_for(self, result):
         # Extract keys from the first result
-        keys = list(results[0].keys())
+        keys = list(result.keys())
 
         # Ensure "Name" and "Description" are the first two columns
         # Remove them from keys if they exist to avoid duplication
@@ -50,35 +176,25 @@ class ResultsView(QWidget):
             keys.remove("Name")
         if "Description" in keys:
             keys.remove("Description")
-            
+
         # Re-insert them at the front
-        keys = ["Name", "Description"] + keys
+        return ["Name", "Description"] + keys
 
-        logger.info(f"Reordered Table Column Keys: {keys}")
+    def _set_headers(self, keys):
+        if keys != self.last_headers:
+            logger.info(f"Reordered Table Column Keys: {keys}")
         self.last_headers = keys
-        self.table.setColumnCount(len(keys))
-        self.table.setHorizontalHeaderLabels(keys)
-        self.table.setRowCount(len(results))
-
-        for r, res in enumerate(results):
-            # Always set Name and Description at columns 0 and 1
-            name_val = str(res.get("Name", ""))
-            description_val = str(res.get("Description", ""))
-            name_item = QTableWidgetItem(name_val)
-            description_item = QTableWidgetItem(description_val)
-
-            self.table.setItem(r, 0, name_item)
-            self.table.setItem(r, 1, description_item)
-
-            # Set remaining columns
-            # Start from column 2 for other keys
-            col_index = 2
-            for k in keys[2:]:  # keys after Name and Description
-                val = str(res.get(k, ""))
-                item = QTableWidgetItem(val)
-                self.table.setItem(r, col_index, item)
-                col_index += 1
-
-        # Adjust column widths:
-        for i in range(0, len(keys)):
-            self.table.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeToContents)
+
+    def _size_columns(self):
+        """Fit columns to their header and the first SIZING_SAMPLE_ROWS rows, within fixed bounds."""
+        rows = min(self.model.rowCount(), self.SIZING_SAMPLE_ROWS)
+        metrics = self.table.fontMetrics()
+        header_metrics = self.table.horizontalHeader().fontMetrics()
+        padding = 24
+        for column, header in enumerate(self.model.headers):
+            width = header_metrics.horizontalAdvance(header)
+            for row in range(rows):
+                width = max(width, metrics.horizontalAdvance(self.model.row_texts(row)[column]))
+            limit = self.MAX_DESCRIPTION_WIDTH if header == "Description" else self.MAX_COLUMN_WIDTH
+            self.table.setColumnWidth(column, max(self.MIN_COLUMN_WIDTH, min(width + padding, limit)))
+        self._sized_rows = rows
@@ -0,0 +1,176 @@
+from PySide6.QtCore import Qt, Signal, QAbstractItemModel, QModelIndex
+from PySide6.QtGui import QColor, QBrush
+
+# Background per depth, so each level of the tree stands out from its parent
+PALETTE = [
+    "#7BD3EA",
+    "#A1EEBD",
+    "#F6D6D6",
+    "#F6F7C4",
+    "#999B84",
+    "#FFF6E3",
+    "#F9C0AB",
+    "#C1D8C3",
+    "#E4C59E",
+]
+
+
+class TaxonomyModel(QAbstractItemModel):
+    """
+    Checkable tree model over a Taxonomy. Indexes are a row plus the node id, so loading a file
+    is a model reset: the view only asks for the children of rows it expands, and text, colour
+    and check state are answered from the taxonomy when a row is painted.
+
+    Check state lives in `checked`, the ids of the checked leaves, plus a count of checked
+    leaves under each group from which a group's Checked/PartiallyChecked/Unchecked state
+    follows. Checking a group checks every leaf below it in one step and emits
+    `checked_changed` once. Without a taxonomy the model shows a single placeholder row.
+    """
+
+    checked_changed = Signal()
+
+    def __init__(self, title, placeholder, parent=None):
+        super().__init__(parent)
+        self.title = title
+        self.placeholder = placeholder
+        self.taxonomy = None
+        self.checked = set()
+        # Node ids the tree's filter currently hides, so the next filter only applies the difference
+        self.hidden = set()
+        self._checked_below = {}
+        self._brushes = [QBrush(QColor(color)) for color in PALETTE]
+
+    def set_taxonomy(self, taxonomy):
+        """Show `taxonomy` (or the placeholder for None) with nothing checked."""
+        self.beginResetModel()
+        self.taxonomy = taxonomy
+        self.checked = set()
+        self.hidden = set()
+        self._checked_below = {}
+        self.endResetModel()
+
+    def node(self, index):
+        """The TaxonomyNode at `index`, or None for the placeholder or an invalid index."""
+        if not index.isValid() or self.taxonomy is None:
+            return None
+        return self.taxonomy.nodes[index.internalId()]
+
+    def index_for(self, node):
+        return QModelIndex() if node is None else self.createIndex(node.row, 0, node.id)
+
+    def checked_leaves(self):
+        """Checked leaf nodes in tree order."""
+        return [self.taxonomy.nodes[node_id] for node_id in sorted(self.checked)]
+
+    def _children(self, parent):
+        node = self.node(parent)
+        return node.children if node is not None else self.taxonomy.roots
+
+    def index(self, row, column, parent=QModelIndex()):
+        if column != 0 or row < 0:
+            return QModelIndex()
+        if self.taxonomy is None:
+            return self.createIndex(row, 0, 0) if row == 0 and not parent.isValid() else QModelIndex()
+        children = self._children(parent)
+        if row >= len(children):
+            return QModelIndex()
+        return self.createIndex(row, 0, children[row].id)
+
+    def parent(self, index):
+        node = self.node(index)
+        if node is None:
+            return QModelIndex()
+        return self.index_for(node.parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        if self.taxonomy is None:
+            return 0 if parent.isValid() else 1
+        return len(self._children(parent))
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        return self.rowCount(parent) > 0
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole and section == 0:
+            return self.title
+        return None
+
+    def flags(self, index):
+        node = self.node(index)
+        if node is None:
+            return Qt.ItemIsEnabled if index.isValid() else Qt.NoItemFlags
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return flags | Qt.ItemIsAutoTristate if node.children else flags
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self.node(index)
+        if node is None:
+            return self.placeholder if role == Qt.DisplayRole else None
+        if role == Qt.DisplayRole:
+            return node.text
+        if role == Qt.CheckStateRole:
+            return self.check_state(node)
+        if role == Qt.BackgroundRole:
+            return self._brushes[node.depth % len(self._brushes)]
+        return None
+
+    def check_state(self, node):
+        if not node.children:
+            return Qt.Checked if node.id in self.checked else Qt.Unchecked
+        below = self._checked_below.get(node.id, 0)
+        if below == 0:
+            return Qt.Unchecked
+        return Qt.Checked if below == node.leaf_count else Qt.PartiallyChecked
+
+    def setData(self, index, value, role=Qt.EditRole):
+        node = self.node(index)
+        if node is None or role != Qt.CheckStateRole:
+            return False
+        self.set_checked([node], Qt.CheckState(value) == Qt.Checked)
+        return True
+
+    def set_checked(self, nodes, checked):
+        """Check or uncheck `nodes` and everything below them as a single change."""
+        changed = [
+            leaf_id for node in nodes for leaf_id in self.taxonomy.leaf_ids(node)
+            if (leaf_id in self.checked) != checked
+        ]
+        if not changed:
+            return
+        step = 1 if checked else -1
+        for leaf_id in changed:
+            if checked:
+                self.checked.add(leaf_id)
+            else:
+                self.checked.discard(leaf_id)
+            parent = self.taxonomy.nodes[leaf_id].parent
+            while parent is not None:
+                self._checked_below[parent.id] = self._checked_below.get(parent.id, 0) + step
+                parent = parent.parent
+        self._emit_check_states(nodes)
+        self.checked_changed.emit()
+
+    def _emit_check_states(self, nodes):
+        roles = [Qt.CheckStateRole]
+        ancestors = set()
+        for node in nodes:
+            index = self.index_for(node)
+            self.dataChanged.emit(index, index, roles)
+            parent = node.parent
+            while parent is not None and parent.id not in ancestors:
+                ancestors.add(parent.id)
+                index = self.index_for(parent)
+                self.dataChanged.emit(index, index, roles)
+                parent = parent.parent
+            # One signal per group for the rows below it
+            for group in self.taxonomy.nodes[node.id:node.end]:
+                if group.children:
+                    first, last = group.children[0], group.children[-1]
+                    self.dataChanged.emit(self.index_for(first), self.index_for(last), roles)
@@ -1,5 +1,6 @@
 import json
 
-def load_config(self, path='src/config/config.json'):
-    with open(path, "r") as f:
-        return json.load(f)
\ No newline at end of file
+def load_config(path='src/config/config.json'):
+    """Read and parse a config file. Components use the shared, cached Config from src.services.config_service."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)